@@ -0,0 +1,157 @@
+import os
+from itertools import islice
+
+import numpy as np
+
+from instrumentacion import contar, fase
+
+# Extensión del formato binario: un arreglo float64 de NumPy (.npy) que se abre con memmap
+EXTENSION_BINARIA = '.npy'
+
+# Cantidad de números por bloque al recorrer un archivo en modo streaming
+TAMANO_BLOQUE = 1 << 20
+
+
+def ruta_binaria(nombre_archivo):
+    """
+    Obtiene la ruta del archivo binario que corresponde a un archivo de números.
+    Args:
+        nombre_archivo: El nombre del archivo CSV o binario.
+
+    Returns:
+        La ruta del archivo .npy con el mismo nombre base.
+    """
+    return os.path.splitext(nombre_archivo)[0] + EXTENSION_BINARIA
+
+
+def leer_csv(nombre_archivo):
+    """
+    Lee un archivo CSV de números pseudoaleatorios de forma vectorizada.
+    Args:
+        nombre_archivo: El nombre del archivo CSV.
+
+    Returns:
+        Un arreglo float64 con los números de la primera columna.
+    """
+    return np.loadtxt(nombre_archivo, delimiter=',', usecols=0, dtype=np.float64, ndmin=1)
+
+
+def guardar_binario(nombre_archivo, numeros):
+    """
+    Guarda números pseudoaleatorios en formato binario.
+
+    El archivo se escribe primero con un nombre temporal y luego se renombra, para que
+    un lector nunca vea un archivo a medio escribir.
+
+    Args:
+        nombre_archivo: El nombre del archivo .npy.
+        numeros: Los números pseudoaleatorios.
+    """
+    temporal = nombre_archivo + '.tmp'
+    try:
+        with open(temporal, 'wb') as archivo:
+            np.save(archivo, np.asarray(numeros, dtype=np.float64))
+        os.replace(temporal, nombre_archivo)
+    except OSError:
+        # No deja el temporal a medio escribir (por ejemplo, con el disco lleno)
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def crear_binario(nombre_archivo, cantidad_datos):
+    """
+    Crea un archivo binario vacío y lo abre con memmap para escribir en él.
+    Args:
+        nombre_archivo: El nombre del archivo .npy.
+        cantidad_datos: La cantidad de números que tendrá el archivo.
+
+    Returns:
+        Un memmap float64 de escritura respaldado por el archivo.
+    """
+    return np.lib.format.open_memmap(nombre_archivo, mode='w+', dtype=np.float64, shape=(cantidad_datos,))
+
+
+def convertir_csv(nombre_csv, nombre_binario=None):
+    """
+    Convierte un archivo CSV de números pseudoaleatorios al formato binario.
+    Args:
+        nombre_csv: El nombre del archivo CSV.
+        nombre_binario: El nombre del archivo .npy (por defecto, el mismo nombre base).
+
+    Returns:
+        El nombre del archivo binario creado.
+    """
+    if nombre_binario is None:
+        nombre_binario = ruta_binaria(nombre_csv)
+    guardar_binario(nombre_binario, leer_csv(nombre_csv))
+    return nombre_binario
+
+
+def cargar_numeros(nombre_archivo):
+    """
+    Carga números pseudoaleatorios con memmap, sin copiarlos a memoria.
+
+    Si se recibe un CSV, se convierte una sola vez a un .npy al lado del original y las
+    cargas siguientes usan ese archivo mientras el CSV no cambie. Si el .npy no se puede
+    escribir (por ejemplo, en un directorio sin permisos), el CSV se lee a memoria.
+
+    Args:
+        nombre_archivo: El nombre del archivo CSV o .npy.
+
+    Returns:
+        Un arreglo float64 de solo lectura respaldado por el archivo binario (o en
+        memoria, si el binario no se pudo escribir).
+    """
+    with fase('carga'):
+        numeros = None
+        if not nombre_archivo.endswith(EXTENSION_BINARIA):
+            nombre_binario = ruta_binaria(nombre_archivo)
+            if not os.path.exists(nombre_binario) or os.path.getmtime(nombre_binario) < os.path.getmtime(nombre_archivo):
+                leidos = leer_csv(nombre_archivo)
+                try:
+                    guardar_binario(nombre_binario, leidos)
+                except OSError:
+                    # Se usan los números ya leídos, sin memmap
+                    contar('conversiones_fallidas')
+                    leidos.setflags(write=False)
+                    numeros = leidos
+            nombre_archivo = nombre_binario
+        if numeros is None:
+            numeros = np.load(nombre_archivo, mmap_mode='r')
+    contar('numeros_cargados', len(numeros))
+    return numeros
+
+
+def leer_bloques(nombre_archivo, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Recorre un archivo de números pseudoaleatorios por bloques de tamaño fijo.
+
+    A diferencia de cargar_numeros, un CSV no se convierte ni se carga completo: se leen
+    solo las filas del bloque actual, así que la memoria queda acotada por tamano_bloque.
+
+    Args:
+        nombre_archivo: El nombre del archivo CSV o .npy.
+        tamano_bloque: La cantidad de números por bloque.
+
+    Yields:
+        Arreglos float64 con a lo sumo tamano_bloque números.
+    """
+    if nombre_archivo.endswith(EXTENSION_BINARIA):
+        numeros = np.load(nombre_archivo, mmap_mode='r')
+        for inicio in range(0, len(numeros), tamano_bloque):
+            with fase('carga'):
+                bloque = np.array(numeros[inicio:inicio + tamano_bloque])
+            contar('numeros_cargados', len(bloque))
+            yield bloque
+        return
+
+    with open(nombre_archivo, 'r') as archivo_csv:
+        while True:
+            with fase('carga'):
+                filas = list(islice(archivo_csv, tamano_bloque))
+                if not filas:
+                    return
+                bloque = np.loadtxt(filas, delimiter=',', usecols=0, dtype=np.float64, ndmin=1)
+            contar('numeros_cargados', len(bloque))
+            yield bloque
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import almacen_numeros
+import cache_resultados
+import simulacion
+
+# Archivo del directorio del barrido donde se guarda cada celda terminada (una línea JSON por celda)
+ARCHIVO_PUNTOS_CONTROL = 'celdas.jsonl'
+
+# Archivo del directorio del barrido que identifica el flujo de números con que se simuló
+ARCHIVO_FLUJO = 'flujo.json'
+
+# Campos de la tabla consolidada: los parámetros de la celda seguidos del resumen de la simulación
+CAMPOS = ('limite_saltos', 'distancia') + simulacion.CAMPOS
+
+
+def objetivos_en_eje(dimensiones, distancias):
+    """
+    Genera objetivos sobre el eje X a distintas distancias del origen.
+    Args:
+        dimensiones: El número de dimensiones.
+        distancias: Las distancias (en saltos) al origen.
+
+    Returns:
+        Una lista de objetivos [d, 0, ..., 0].
+    """
+    return [[int(distancia)] + [0] * (dimensiones - 1) for distancia in distancias]
+
+
+def crear_celdas(dimensiones, objetivos=None, distancias=None, limites=(None,)):
+    """
+    Arma la grilla de celdas del barrido (el producto de dimensiones, objetivos y límites).
+    Args:
+        dimensiones: Las dimensiones a simular.
+        objetivos: Objetivos explícitos; solo se usan los que tienen tantas coordenadas
+            como la dimensión de la celda.
+        distancias: Distancias al origen para generar objetivos sobre el eje X.
+        limites: Las longitudes de flujo (cantidad máxima de saltos); None usa todo el flujo.
+
+    Returns:
+        Una lista de celdas, cada una un diccionario con dimensiones, objetivo y limite_saltos.
+    """
+    celdas = []
+    for dimension in dimensiones:
+        objetivos_dimension = [list(objetivo) for objetivo in objetivos or [] if len(objetivo) == dimension]
+        objetivos_dimension += objetivos_en_eje(dimension, distancias or [])
+        for objetivo in objetivos_dimension or [simulacion.OBJETIVOS.get(dimension)]:
+            for limite in limites:
+                celdas.append({'dimensiones': dimension, 'objetivo': objetivo, 'limite_saltos': limite})
+    return celdas
+
+
+def clave_celda(celda):
+    """
+    Obtiene la clave con que se identifica una celda en los puntos de control.
+    """
+    return json.dumps([celda['dimensiones'], celda['objetivo'], celda['limite_saltos']])
+
+
+def _ejecutar_celda(celda, entrada):
+    """
+    Simula una celda del barrido (se ejecuta en un proceso hijo).
+    """
+    resumen = simulacion.ejecutar_simulacion(celda['dimensiones'], celda['objetivo'], entrada, celda['limite_saltos'])
+    objetivo = celda['objetivo']
+    return {
+        'limite_saltos': celda['limite_saltos'],
+        # Distancia en la red (cantidad mínima de saltos) del origen al objetivo
+        'distancia': None if objetivo is None else sum(abs(coordenada) for coordenada in objetivo),
+        **resumen,
+    }
+
+
+def leer_puntos_control(directorio):
+    """
+    Lee las celdas ya terminadas de un barrido.
+    Args:
+        directorio: El directorio del barrido.
+
+    Returns:
+        Un diccionario de clave de celda a resultado.
+    """
+    terminadas = {}
+    try:
+        with open(os.path.join(directorio, ARCHIVO_PUNTOS_CONTROL), 'r') as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    # Una línea incompleta queda si el barrido se interrumpió mientras se escribía
+                    continue
+                terminadas[registro['clave']] = registro['resultado']
+    except FileNotFoundError:
+        pass
+    return terminadas
+
+
+def verificar_flujo(directorio, entrada):
+    """
+    Comprueba que un directorio de barrido corresponde al flujo de números indicado.
+
+    La primera vez se guarda la huella del contenido del flujo; al retomar, las celdas ya
+    terminadas solo se reutilizan si el flujo es el mismo.
+
+    Args:
+        directorio: El directorio del barrido.
+        entrada: El archivo .npy con los números pseudoaleatorios.
+
+    Raises:
+        ValueError: Si el directorio se usó con otro flujo (o con uno que no se registró).
+    """
+    huella = cache_resultados.huella_flujo(np.load(entrada, mmap_mode='r'))
+    ruta = os.path.join(directorio, ARCHIVO_FLUJO)
+    try:
+        with open(ruta, 'r') as archivo:
+            registrado = json.load(archivo)
+    except FileNotFoundError:
+        if os.path.exists(os.path.join(directorio, ARCHIVO_PUNTOS_CONTROL)):
+            raise ValueError(f"El barrido de {directorio} no registra con qué flujo se simuló; "
+                             f"use otro directorio") from None
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w') as archivo:
+            json.dump({'huella': huella, 'entrada': os.path.abspath(entrada)}, archivo)
+        os.replace(temporal, ruta)
+        return
+    if registrado.get('huella') != huella:
+        raise ValueError(f"El barrido de {directorio} se simuló con otro flujo ({registrado.get('entrada')}); "
+                         f"use otro directorio para {entrada}")
+
+
+def ejecutar_barrido(celdas, entrada, directorio, procesos=None, al_terminar_celda=None):
+    """
+    Ejecuta las celdas de un barrido en varios procesos, retomando las ya terminadas.
+
+    Cada celda terminada se agrega de inmediato al archivo de puntos de control del
+    directorio, así que si el barrido se interrumpe, la siguiente ejecución solo simula
+    las celdas pendientes. El directorio queda asociado al flujo de entrada y no se puede
+    retomar con otro (ver verificar_flujo).
+
+    Args:
+        celdas: Las celdas devueltas por crear_celdas.
+        entrada: El archivo CSV o .npy con los números pseudoaleatorios.
+        directorio: El directorio del barrido (puntos de control).
+        procesos: La cantidad de procesos (por defecto, uno por núcleo).
+        al_terminar_celda: Función opcional que recibe (celda, resultado, terminadas, total).
+
+    Returns:
+        Los resultados de todas las celdas, en el orden de celdas.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    if not entrada.endswith(almacen_numeros.EXTENSION_BINARIA):
+        # El CSV se convierte una sola vez; los procesos leen el .npy con memmap
+        almacen_numeros.cargar_numeros(entrada)
+        entrada = almacen_numeros.ruta_binaria(entrada)
+    verificar_flujo(directorio, entrada)
+
+    resultados = leer_puntos_control(directorio)
+    pendientes = {clave_celda(celda): celda for celda in celdas if clave_celda(celda) not in resultados}
+    terminadas = len(celdas) - len(pendientes)
+
+    if pendientes:
+        ruta = os.path.join(directorio, ARCHIVO_PUNTOS_CONTROL)
+        with open(ruta, 'a+b') as archivo, ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as ejecutor:
+            # Si la última línea quedó incompleta, las celdas nuevas empiezan en otra línea
+            if archivo.tell() > 0:
+                archivo.seek(-1, os.SEEK_END)
+                if archivo.read(1) != b'\n':
+                    archivo.write(b'\n')
+            futuros = {ejecutor.submit(_ejecutar_celda, celda, entrada): clave for clave, celda in pendientes.items()}
+            for futuro in as_completed(futuros):
+                clave = futuros[futuro]
+                resultados[clave] = futuro.result()
+                archivo.write((json.dumps({'clave': clave, 'resultado': resultados[clave]}) + '\n').encode())
+                archivo.flush()
+                os.fsync(archivo.fileno())
+                terminadas += 1
+                if al_terminar_celda is not None:
+                    al_terminar_celda(pendientes[clave], resultados[clave], terminadas, len(celdas))
+
+    return [resultados[clave_celda(celda)] for celda in celdas]
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos: python -m barrido.
+    Args:
+        argumentos: Los argumentos de la línea de comandos (por defecto, sys.argv).
+    """
+    parser = argparse.ArgumentParser(prog='python -m barrido',
+                                     description="Barrido de simulaciones sobre objetivos, dimensiones y longitudes de flujo.")
+    parser.add_argument('-d', '--dimensiones', type=int, nargs='+', required=True, help="Dimensiones a simular.")
+    parser.add_argument('-o', '--objetivo', type=int, nargs='+', action='append',
+                        help="Coordenadas de un objetivo; se puede repetir.")
+    parser.add_argument('-r', '--distancias', type=int, nargs='+', default=None,
+                        help="Distancias al origen de objetivos generados sobre el eje X.")
+    parser.add_argument('-l', '--limites', type=int, nargs='+', default=None,
+                        help="Longitudes de flujo (cantidad máxima de saltos); por defecto, todo el flujo.")
+    parser.add_argument('-e', '--entrada', default=simulacion.ARCHIVO_NUMEROS, help="Archivo CSV o .npy con los números pseudoaleatorios.")
+    parser.add_argument('-c', '--directorio', required=True, help="Directorio de puntos de control del barrido.")
+    parser.add_argument('-p', '--procesos', type=int, default=None, help="Cantidad de procesos.")
+    parser.add_argument('-f', '--formato', choices=simulacion.FORMATOS, default='csv', help="Formato de la tabla de resultados.")
+    parser.add_argument('-s', '--salida', default=None, help="Archivo de la tabla (por defecto, la salida estándar).")
+    args = parser.parse_args(argumentos)
+    for objetivo in args.objetivo or []:
+        if len(objetivo) not in args.dimensiones:
+            parser.error(f"El objetivo {objetivo} no corresponde a ninguna de las dimensiones {args.dimensiones}")
+    if args.formato == 'columnar' and args.salida is None:
+        parser.error("El formato columnar necesita --salida")
+
+    celdas = crear_celdas(args.dimensiones, args.objetivo, args.distancias, args.limites or [None])
+
+    def al_terminar_celda(celda, resultado, terminadas, total):
+        estado = 'llegó' if resultado['alcanzado'] else 'no llegó'
+        print(f"[{terminadas}/{total}] {celda['dimensiones']}D {celda['objetivo']} "
+              f"límite {celda['limite_saltos']}: {estado} en {resultado['saltos']} saltos", file=sys.stderr)
+
+    try:
+        resultados = ejecutar_barrido(celdas, args.entrada, args.directorio, args.procesos, al_terminar_celda)
+    except ValueError as error:
+        parser.error(str(error))
+    simulacion.escribir_resultados(resultados, args.formato, args.salida, CAMPOS)
+
+
+if __name__ == "__main__":
+    main()
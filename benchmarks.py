@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import almacen_numeros
+import crearCSV
+import motor_caminata
+import renderizado
+import validacion_flujo
+
+# Tamaños de entrada por defecto: de 10^3 a 10^7 números
+TAMANOS = tuple(10 ** exponente for exponente in range(3, 8))
+
+# Cantidad de veces que se repite cada medición (se conserva la más rápida)
+REPETICIONES = 3
+
+# Fracción en que el tiempo o la memoria pueden superar la línea base antes de marcar una regresión
+TOLERANCIA = 0.25
+
+# Por debajo de esta duración las diferencias con la línea base se consideran ruido
+DURACION_MINIMA = 0.005
+
+SEMILLA = 20231
+
+
+def _uniformes(tamano):
+    """
+    Genera los números pseudoaleatorios de entrada de un caso.
+    """
+    return np.random.default_rng(SEMILLA).random(tamano)
+
+
+def _preparar_leer_csv(tamano, directorio):
+    nombre = os.path.join(directorio, f'numeros_{tamano}.csv')
+    if not os.path.exists(nombre):
+        crearCSV.crear_csv_numeros_aleatorios(nombre, tamano, semilla=SEMILLA)
+    return lambda: almacen_numeros.leer_csv(nombre)
+
+
+def _preparar_mapeo(dimensiones):
+    def preparar(tamano, directorio):
+        numeros = _uniformes(tamano)
+        return lambda: motor_caminata.mapear_saltos(numeros, dimensiones)
+    return preparar
+
+
+def _preparar_simulate_frog(tamano, directorio):
+    # SimuladorRana.simulate_frog_from_data delega en esta función del motor; se mide
+    # directamente para no cargar tkinter, matplotlib y PIL con rana
+    saltos = motor_caminata.mapear_saltos(_uniformes(tamano), 1)[:, 0]
+    return lambda: motor_caminata.posiciones_desde_saltos(saltos)
+
+
+def _preparar_caminata(dimensiones):
+    def preparar(tamano, directorio):
+        numeros = _uniformes(tamano)
+        # Un objetivo inalcanzable obliga a consumir todos los números
+        objetivo = [tamano + 1] + [0] * (dimensiones - 1)
+        return lambda: motor_caminata.simular_hasta_objetivo(dimensiones, objetivo, numeros)
+    return preparar
+
+
+def _preparar_generacion(tamano, directorio):
+    nombre = os.path.join(directorio, 'generado.csv')
+    return lambda: crearCSV.crear_csv_numeros_aleatorios(nombre, tamano, semilla=SEMILLA)
+
+
+def _preparar_validacion(tamano, directorio):
+    numeros = _uniformes(tamano)
+    bloques = [numeros[inicio:inicio + almacen_numeros.TAMANO_BLOQUE]
+               for inicio in range(0, tamano, almacen_numeros.TAMANO_BLOQUE)]
+    return lambda: validacion_flujo.validar_bloques(bloques)
+
+
+def _preparar_figura(dimensiones):
+    def preparar(tamano, directorio):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        _, posiciones = motor_caminata.simular_hasta_objetivo(dimensiones, None, _uniformes(tamano))
+
+        def construir():
+            figura = Figure(figsize=(8, 6))
+            FigureCanvasAgg(figura)
+            if dimensiones == 1:
+                eje_linea, eje_histograma = figura.subplots(2, 1)
+                renderizado.dibujar_linea_1dim(eje_linea, posiciones)
+                renderizado.dibujar_histograma(eje_histograma, posiciones, desde=1)
+            elif dimensiones == 2:
+                eje = figura.add_subplot()
+                renderizado.dibujar_densidad_2dim(eje, posiciones)
+                renderizado.dibujar_trayectoria(eje, posiciones, linewidth=0.5)
+            else:
+                eje = figura.add_subplot(projection='3d')
+                renderizado.dibujar_trayectoria(eje, posiciones, linewidth=0.5)
+            figura.canvas.draw()
+        return construir
+    return preparar
+
+
+# Casos de la suite: nombre -> función que recibe (tamaño, directorio temporal) y
+# devuelve la función a medir
+CASOS = {
+    'leer_csv': _preparar_leer_csv,
+    'mapeo_1dim': _preparar_mapeo(1),
+    'mapeo_2dim': _preparar_mapeo(2),
+    'mapeo_3dim': _preparar_mapeo(3),
+    'simulate_frog_from_data': _preparar_simulate_frog,
+    'caminata_2dim': _preparar_caminata(2),
+    'caminata_3dim': _preparar_caminata(3),
+    'generacion_csv': _preparar_generacion,
+    'validacion_flujo': _preparar_validacion,
+    'figura_1dim': _preparar_figura(1),
+    'figura_2dim': _preparar_figura(2),
+    'figura_3dim': _preparar_figura(3),
+}
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """
+    Mide el tiempo y la memoria máxima de una función.
+
+    El tiempo es el mínimo de varias repeticiones sin tracemalloc; la memoria se mide en
+    una ejecución aparte con tracemalloc (NumPy registra allí sus arreglos).
+
+    Args:
+        funcion: La función sin argumentos que se mide.
+        repeticiones: La cantidad de repeticiones para el tiempo.
+
+    Returns:
+        La duración en segundos y el pico de memoria en bytes.
+    """
+    duraciones = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        duraciones.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(duraciones), pico
+
+
+def exponente_escala(tamanos, duraciones):
+    """
+    Estima cómo crece el tiempo con el tamaño (pendiente en escala log-log).
+    Args:
+        tamanos: Los tamaños de entrada.
+        duraciones: Las duraciones correspondientes en segundos.
+
+    Returns:
+        El exponente k de tiempo ~ tamaño^k, o None si no hay al menos dos puntos.
+    """
+    if len(tamanos) < 2:
+        return None
+    pendiente, _ = np.polyfit(np.log(tamanos), np.log(np.maximum(duraciones, 1e-9)), 1)
+    return float(pendiente)
+
+
+def ejecutar_suite(casos=None, tamanos=TAMANOS, repeticiones=REPETICIONES, al_medir=None):
+    """
+    Ejecuta los casos de la suite para cada tamaño de entrada.
+    Args:
+        casos: Los nombres de los casos (por defecto, todos).
+        tamanos: Los tamaños de entrada.
+        repeticiones: La cantidad de repeticiones de cada medición.
+        al_medir: Función opcional que recibe (caso, medición) al terminar cada medición.
+
+    Returns:
+        Un diccionario con el entorno y, por caso, las mediciones y el exponente de escala.
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for caso in casos or CASOS:
+            mediciones = []
+            for tamano in tamanos:
+                duracion, pico = medir(CASOS[caso](tamano, directorio), repeticiones)
+                medicion = {
+                    'tamano': tamano,
+                    'segundos': duracion,
+                    'elementos_por_segundo': tamano / duracion if duracion > 0 else None,
+                    'memoria_pico': pico,
+                }
+                mediciones.append(medicion)
+                if al_medir is not None:
+                    al_medir(caso, medicion)
+            resultados[caso] = {
+                'mediciones': mediciones,
+                'exponente_escala': exponente_escala(tamanos, [medicion['segundos'] for medicion in mediciones]),
+            }
+
+    return {
+        'entorno': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'procesadores': os.cpu_count(),
+        },
+        'repeticiones': repeticiones,
+        'resultados': resultados,
+    }
+
+
+def comparar(actual, linea_base, tolerancia=TOLERANCIA):
+    """
+    Compara una ejecución de la suite con una línea base guardada.
+    Args:
+        actual: El resultado de ejecutar_suite.
+        linea_base: Un resultado anterior de ejecutar_suite.
+        tolerancia: La fracción de aumento permitida en tiempo y memoria.
+
+    Returns:
+        Una lista de regresiones; cada una indica el caso, el tamaño, la métrica y los
+        valores de la línea base y actual.
+    """
+    regresiones = []
+    for caso, resultado in actual['resultados'].items():
+        base = {medicion['tamano']: medicion for medicion in linea_base.get('resultados', {}).get(caso, {}).get('mediciones', [])}
+        for medicion in resultado['mediciones']:
+            anterior = base.get(medicion['tamano'])
+            if anterior is None:
+                continue
+            for metrica, minimo in (('segundos', DURACION_MINIMA), ('memoria_pico', 0)):
+                if medicion[metrica] > max(anterior[metrica], minimo) * (1 + tolerancia):
+                    regresiones.append({
+                        'caso': caso,
+                        'tamano': medicion['tamano'],
+                        'metrica': metrica,
+                        'linea_base': anterior[metrica],
+                        'actual': medicion[metrica],
+                    })
+    return regresiones
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos: python -m benchmarks.
+    Args:
+        argumentos: Los argumentos de la línea de comandos (por defecto, sys.argv).
+
+    Returns:
+        El código de salida: 1 si hubo regresiones respecto de la línea base, 0 si no.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Suite de rendimiento del simulador de la rana.")
+    parser.add_argument('-c', '--casos', nargs='+', choices=sorted(CASOS), default=None, help="Casos a medir (por defecto, todos).")
+    parser.add_argument('-t', '--tamanos', type=int, nargs='+', default=list(TAMANOS), help="Tamaños de entrada.")
+    parser.add_argument('-r', '--repeticiones', type=int, default=REPETICIONES, help="Repeticiones por medición.")
+    parser.add_argument('-s', '--salida', default=None, help="Archivo JSON de resultados (por defecto, la salida estándar).")
+    parser.add_argument('-b', '--linea-base', default=None, help="Archivo JSON con una ejecución anterior para comparar.")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA, help="Aumento relativo permitido antes de marcar una regresión.")
+    args = parser.parse_args(argumentos)
+
+    def al_medir(caso, medicion):
+        print(f"{caso:>24} {medicion['tamano']:>10} {medicion['segundos']:10.4f} s "
+              f"{medicion['memoria_pico'] / 2 ** 20:10.1f} MiB", file=sys.stderr)
+
+    resultado = ejecutar_suite(args.casos, sorted(args.tamanos), args.repeticiones, al_medir)
+    regresiones = []
+    if args.linea_base is not None:
+        with open(args.linea_base, 'r') as archivo:
+            regresiones = comparar(resultado, json.load(archivo), args.tolerancia)
+        resultado['regresiones'] = regresiones
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion['caso']} (tamaño {regresion['tamano']}): {regresion['metrica']} "
+                  f"{regresion['linea_base']:.4g} -> {regresion['actual']:.4g}", file=sys.stderr)
+
+    if args.salida is None:
+        json.dump(resultado, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.salida, 'w') as archivo:
+            json.dump(resultado, archivo, indent=2)
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
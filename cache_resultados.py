@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+import almacen_numeros
+import deteccion
+import distribucion_saltos
+from directorios import DIRECTORIO_CACHE
+from instrumentacion import contar, fase
+
+# Cantidad de resultados que se conservan en memoria y en disco
+CAPACIDAD_MEMORIA = 8
+CAPACIDAD_DISCO = 64
+
+# Cantidad de flujos abiertos que se conservan en memoria
+CAPACIDAD_FLUJOS = 4
+
+# Cantidad de números que se leen por vez al calcular la huella de un flujo
+TAMANO_BLOQUE_HUELLA = 1 << 22
+
+# Errores al leer un resultado del disco que se tratan como si no estuviera guardado
+# (por ejemplo, un .npz truncado por una ejecución interrumpida)
+ERRORES_LECTURA = (OSError, ValueError, EOFError, zipfile.BadZipFile)
+
+
+def _borrar_temporal(ruta):
+    """
+    Borra un archivo temporal que quedó a medio escribir, si existe.
+    """
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+def huella_flujo(numeros):
+    """
+    Calcula una huella del contenido de un flujo de números pseudoaleatorios.
+    Args:
+        numeros: El arreglo (o memmap) de números.
+
+    Returns:
+        El resumen BLAKE2b en hexadecimal de los bytes float64 del flujo.
+    """
+    resumen = hashlib.blake2b(digest_size=16)
+    for inicio in range(0, len(numeros), TAMANO_BLOQUE_HUELLA):
+        bloque = np.ascontiguousarray(numeros[inicio:inicio + TAMANO_BLOQUE_HUELLA], dtype=np.float64)
+        resumen.update(memoryview(bloque).cast('B'))
+    return resumen.hexdigest()
+
+
+class CacheResultados:
+    def __init__(self, directorio=DIRECTORIO_CACHE, capacidad_memoria=CAPACIDAD_MEMORIA, capacidad_disco=CAPACIDAD_DISCO):
+        """
+        Inicializa la caché de flujos y resultados.
+        Args:
+            directorio: El directorio de la caché en disco.
+            capacidad_memoria: La cantidad máxima de resultados en memoria.
+            capacidad_disco: La cantidad máxima de resultados en disco.
+        """
+        self.directorio = directorio
+        self.capacidad_memoria = capacidad_memoria
+        self.capacidad_disco = capacidad_disco
+        self._resultados = OrderedDict()
+        self._flujos = OrderedDict()
+        # La caché se usa desde el hilo de Tk y desde los hilos de trabajo
+        self._candado = threading.Lock()
+
+    def _ruta(self, nombre):
+        """
+        Obtiene la ruta de un archivo dentro del directorio de la caché.
+        """
+        return os.path.join(self.directorio, nombre)
+
+    def _indice_huellas(self):
+        """
+        Lee el índice en disco que asocia archivos de números con su huella.
+        """
+        try:
+            with open(self._ruta('huellas.json'), 'r') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return {}
+
+    def _guardar_indice_huellas(self, indice):
+        """
+        Escribe el índice de huellas de forma atómica.
+
+        Si el directorio no se puede escribir, la huella queda solo en memoria y se vuelve
+        a calcular en la próxima ejecución.
+        """
+        temporal = self._ruta('huellas.json.tmp')
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(temporal, 'w') as archivo:
+                json.dump(indice, archivo)
+            os.replace(temporal, self._ruta('huellas.json'))
+        except OSError:
+            contar('cache_errores_disco')
+            _borrar_temporal(temporal)
+
+    def cargar_numeros(self, nombre_archivo):
+        """
+        Carga un flujo de números y su huella, reutilizando los que no cambiaron.
+
+        Un archivo se identifica por su ruta, tamaño y fecha de modificación; si coinciden
+        con una carga anterior (en esta ejecución o en una previa) no se vuelve a calcular
+        la huella.
+
+        Args:
+            nombre_archivo: El nombre del archivo CSV o .npy.
+
+        Returns:
+            El arreglo de números y la huella de su contenido.
+        """
+        estado = os.stat(nombre_archivo)
+        identidad = f"{os.path.abspath(nombre_archivo)}|{estado.st_size}|{estado.st_mtime_ns}"
+        with self._candado:
+            if identidad in self._flujos:
+                self._flujos.move_to_end(identidad)
+                return self._flujos[identidad]
+
+        numeros = almacen_numeros.cargar_numeros(nombre_archivo)
+        with self._candado:
+            indice = self._indice_huellas()
+            huella = indice.get(identidad)
+            if huella is None:
+                with fase('huella'):
+                    huella = huella_flujo(numeros)
+                indice[identidad] = huella
+                self._guardar_indice_huellas(indice)
+
+            self._flujos[identidad] = (numeros, huella)
+            while len(self._flujos) > CAPACIDAD_FLUJOS:
+                self._flujos.popitem(last=False)
+        return numeros, huella
+
+    def clave(self, huella, dimensiones, objetivo, limite_saltos=None, distribucion=None):
+        """
+        Construye la clave de un resultado.
+        Args:
+            huella: La huella del flujo de números.
+            dimensiones: El número de dimensiones.
+            objetivo: Las coordenadas del punto objetivo, un Objetivo de deteccion o None.
+            limite_saltos: La cantidad máxima de saltos (o None).
+            distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+        Returns:
+            Una cadena que identifica el resultado.
+        """
+        objetivo = deteccion.como_objetivo(objetivo)
+        if objetivo is not None:
+            objetivo = [type(objetivo).__name__, objetivo.describir()]
+        # La tabla de saltos es parte de la clave: si cambia, los resultados guardados no sirven
+        distribucion = distribucion_saltos.como_distribucion(distribucion, int(dimensiones)).describir()
+        descripcion = json.dumps([huella, int(dimensiones), objetivo, limite_saltos, distribucion])
+        return hashlib.blake2b(descripcion.encode(), digest_size=16).hexdigest()
+
+    def obtener(self, clave):
+        """
+        Busca un resultado en memoria y, si no está, en disco.
+        Args:
+            clave: La clave del resultado.
+
+        Returns:
+            Un diccionario con los arreglos del resultado o None si no está guardado.
+        """
+        with self._candado:
+            if clave in self._resultados:
+                self._resultados.move_to_end(clave)
+                contar('cache_aciertos')
+                return self._resultados[clave]
+
+            ruta = self._ruta(clave + '.npz')
+            try:
+                with np.load(ruta) as archivo:
+                    resultado = {nombre: archivo[nombre] for nombre in archivo.files}
+            except ERRORES_LECTURA:
+                # Un archivo dañado cuenta como fallo; guardar lo reemplaza al recalcular
+                contar('cache_fallos')
+                return None
+            contar('cache_aciertos')
+            # Marca el archivo como usado recientemente para el desalojo en disco
+            try:
+                os.utime(ruta)
+            except OSError:
+                contar('cache_errores_disco')
+            self._recordar(clave, resultado)
+            return resultado
+
+    def guardar(self, clave, resultado):
+        """
+        Guarda un resultado en memoria y en disco.
+
+        Si el disco falla (por ejemplo, un directorio sin permisos o una ruta ocupada por
+        un archivo), el resultado queda solo en memoria: la caché nunca hace fallar la
+        simulación.
+
+        Args:
+            clave: La clave del resultado.
+            resultado: Un diccionario de arreglos o valores numéricos.
+        """
+        resultado = {nombre: np.asarray(valor) for nombre, valor in resultado.items()}
+        with self._candado:
+            self._recordar(clave, resultado)
+
+            temporal = self._ruta(clave + '.npz.tmp')
+            try:
+                os.makedirs(self.directorio, exist_ok=True)
+                with open(temporal, 'wb') as archivo:
+                    np.savez(archivo, **resultado)
+                os.replace(temporal, self._ruta(clave + '.npz'))
+                self._desalojar_disco()
+            except OSError:
+                contar('cache_errores_disco')
+                _borrar_temporal(temporal)
+
+    def _recordar(self, clave, resultado):
+        """
+        Agrega un resultado a la memoria, desalojando el usado hace más tiempo.
+        """
+        self._resultados[clave] = resultado
+        self._resultados.move_to_end(clave)
+        while len(self._resultados) > self.capacidad_memoria:
+            self._resultados.popitem(last=False)
+
+    def _desalojar_disco(self):
+        """
+        Borra los resultados en disco usados hace más tiempo si se supera la capacidad.
+        """
+        rutas = [self._ruta(nombre) for nombre in os.listdir(self.directorio) if nombre.endswith('.npz')]
+        if len(rutas) <= self.capacidad_disco:
+            return
+        rutas.sort(key=os.path.getmtime)
+        for ruta in rutas[:len(rutas) - self.capacidad_disco]:
+            os.remove(ruta)
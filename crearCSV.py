@@ -1,38 +1,114 @@
-import csv
-import random
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def crear_csv_numeros_aleatorios(nombre_archivo, cantidad_datos):
-    with open(nombre_archivo, 'w', newline='') as archivo_csv:
-        escritor_csv = csv.writer(archivo_csv)
+import numpy as np
 
-        for _ in range(cantidad_datos):
-            numero_aleatorio = round(random.uniform(0, 1), 5)
-            escritor_csv.writerow([numero_aleatorio])
+import almacen_numeros
+import validacion_flujo
 
-# Reemplaza 'numeros_aleatorios.csv' con el nombre que desees para el archivo CSV
-archivo_csv = 'numeros_aleatorios3.csv'
-cantidad_datos = 10000000  # Puedes ajustar la cantidad de datos que deseas generar
-crear_csv_numeros_aleatorios(archivo_csv, cantidad_datos)
+# Cantidad de números que se generan y escriben por bloque; cada bloque tiene su propio
+# generador, así que el resultado no depende de cuántos hilos se usen
+TAMANO_BLOQUE = 1 << 20
 
-print(f'Se ha creado el archivo "{archivo_csv}" con {cantidad_datos} números aleatorios.')
+# Los números se redondean a 5 decimales, como con round(random.uniform(0, 1), 5)
+DECIMALES = 5
+ESCALA = 10 ** DECIMALES
 
-def contar_valores(nombre_archivo):
+def crear_generadores(semilla, cantidad):
+    # Subflujos independientes derivados de una misma semilla con SeedSequence.spawn
+    return [np.random.Generator(np.random.PCG64(hijo)) for hijo in np.random.SeedSequence(semilla).spawn(cantidad)]
+
+def _generar_bloque(generador, cantidad):
+    # Devuelve los números escalados a enteros en [0, ESCALA] y cuántos son menores a 0.5
+    enteros = np.rint(generador.random(cantidad) * ESCALA).astype(np.int64)
+    return enteros, int(np.count_nonzero(enteros < ESCALA // 2))
+
+def _texto_csv(enteros):
+    # Da formato "D.DDDDD\n" a cada número de forma vectorizada, sin pasar por str()
+    caracteres = np.empty((len(enteros), DECIMALES + 3), dtype=np.uint8)
+    caracteres[:, 0] = ord('0') + enteros // ESCALA
+    caracteres[:, 1] = ord('.')
+    resto = enteros % ESCALA
+    for posicion in range(DECIMALES + 1, 1, -1):
+        caracteres[:, posicion] = ord('0') + resto % 10
+        resto //= 10
+    caracteres[:, -1] = ord('\n')
+    return caracteres.tobytes()
+
+def _generar(cantidad_datos, semilla, hilos, escribir_bloque, validar=False):
+    # Genera los bloques en paralelo y los entrega en orden, sumando los conteos en la misma pasada
+    # (y, con validar, pasando cada bloque por las pruebas de validacion_flujo, que son las
+    # que deciden si el flujo es uniforme e independiente)
+    cantidad_bloques = -(-cantidad_datos // TAMANO_BLOQUE)
+    generadores = crear_generadores(semilla, cantidad_bloques)
+    hilos = hilos or os.cpu_count()
     menores_05 = 0
-    mayores_05 = 0
+    validador = validacion_flujo.ValidadorFlujo() if validar else None
+
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        # Se procesan ventanas de tantos bloques como hilos para acotar la memoria
+        for primero in range(0, cantidad_bloques, hilos):
+            indices = range(primero, min(primero + hilos, cantidad_bloques))
+            tamanos = [min(TAMANO_BLOQUE, cantidad_datos - i * TAMANO_BLOQUE) for i in indices]
+            for i, (enteros, menores) in zip(indices, ejecutor.map(
+                    _generar_bloque, [generadores[i] for i in indices], tamanos)):
+                escribir_bloque(i * TAMANO_BLOQUE, enteros)
+                if validador is not None:
+                    validador.actualizar(enteros / ESCALA)
+                menores_05 += menores
+
+    conteos = {
+        'cantidad': cantidad_datos,
+        'menores_05': menores_05,
+        'mayores_05': cantidad_datos - menores_05,
+    }
+    if validador is not None:
+        conteos['validacion'] = validador.informe()
+    return conteos
 
-    with open(nombre_archivo, 'r') as archivo_csv:
-        lector_csv = csv.reader(archivo_csv)
-        for fila in lector_csv:
-            numero = float(fila[0])
-            if numero < 0.5:
-                menores_05 += 1
-            else:
-                mayores_05 += 1
+def crear_csv_numeros_aleatorios(nombre_archivo, cantidad_datos, semilla=None, hilos=None, validar=False):
+    with open(nombre_archivo, 'wb') as archivo_csv:
+        return _generar(cantidad_datos, semilla, hilos,
+                        lambda inicio, enteros: archivo_csv.write(_texto_csv(enteros)), validar)
+
+def crear_binario_numeros_aleatorios(nombre_archivo, cantidad_datos, semilla=None, hilos=None, validar=False):
+    # Escribe los números por bloques directamente en un .npy abierto con memmap
+    numeros = almacen_numeros.crear_binario(nombre_archivo, cantidad_datos)
+
+    def escribir_bloque(inicio, enteros):
+        numeros[inicio:inicio + len(enteros)] = enteros / ESCALA
+
+    conteos = _generar(cantidad_datos, semilla, hilos, escribir_bloque, validar)
+    numeros.flush()
+    return conteos
+
+def contar_valores(nombre_archivo):
+    # Acepta el CSV o el .npy; el CSV se convierte una sola vez a binario
+    numeros = almacen_numeros.cargar_numeros(nombre_archivo)
+    menores_05 = int(np.count_nonzero(numeros < 0.5))
+    mayores_05 = len(numeros) - menores_05
 
     return menores_05, mayores_05
 
-archivo_csv = 'numeros_aleatorios3.csv'
-menores, mayores = contar_valores(archivo_csv)
+if __name__ == "__main__":
+    # Reemplaza 'numeros_aleatorios3.npy' con el nombre que desees para el archivo binario
+    # (crear_csv_numeros_aleatorios genera el mismo flujo en formato CSV)
+    archivo_numeros = 'numeros_aleatorios3.npy'
+    cantidad_datos = 10000000  # Puedes ajustar la cantidad de datos que deseas generar
+    semilla = 20231  # Con la misma semilla se obtiene siempre el mismo archivo
+
+    inicio = time.perf_counter()
+    # Con validar=True el flujo pasa por las pruebas de validacion_flujo mientras se genera
+    conteos = crear_binario_numeros_aleatorios(archivo_numeros, cantidad_datos, semilla, validar=True)
+    duracion = time.perf_counter() - inicio
 
-print(f'Cantidad de valores menores a 0.5: {menores}')
-print(f'Cantidad de valores mayores o iguales a 0.5: {mayores}')
\ No newline at end of file
+    print(f'Se ha creado el archivo "{archivo_numeros}" con {cantidad_datos} números aleatorios en {duracion:.2f} segundos.')
+    print(f'Cantidad de valores menores a 0.5: {conteos["menores_05"]}')
+    print(f'Cantidad de valores mayores o iguales a 0.5: {conteos["mayores_05"]}')
+    validacion = conteos['validacion']
+    chi_cuadrado = validacion['pruebas']['chi_cuadrado']
+    print(f'Chi-cuadrado con {validacion_flujo.CUBETAS} cubetas: {chi_cuadrado["estadistica"]:.3f} '
+          f'(valor p = {chi_cuadrado["valor_p"]:.3f})')
+    print(f'Validación (alfa = {validacion["alfa"]}): '
+          f'{"aprobada" if validacion["valido"] else "rechazada: " + ", ".join(validacion_flujo.motivos_rechazo(validacion))}')
@@ -0,0 +1,211 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+def _claves(posiciones):
+    """
+    Convierte cada posición entera en una clave de bytes comparable (un escalar void).
+    """
+    posiciones = np.ascontiguousarray(posiciones, dtype=np.int64)
+    return posiciones.view(np.dtype((np.void, 8 * posiciones.shape[-1])))[..., 0]
+
+
+class Objetivo(ABC):
+    """
+    Región de la red entera que detiene a la rana cuando la toca.
+
+    Las subclases implementan impactos(), que revisa de forma vectorizada un arreglo de
+    posiciones de forma (..., dimensiones), y describir(); pueden redefinir contiene()
+    para revisar una sola posición en O(1).
+    """
+
+    @abstractmethod
+    def impactos(self, posiciones):
+        """
+        Indica qué posiciones están dentro del objetivo.
+        Args:
+            posiciones: Un arreglo entero de forma (..., dimensiones).
+
+        Returns:
+            Un arreglo booleano con la forma de posiciones sin el último eje.
+        """
+
+    def contiene(self, posicion):
+        """
+        Indica si una posición está dentro del objetivo.
+        Args:
+            posicion: Las coordenadas enteras de la posición.
+
+        Returns:
+            True si la posición está dentro del objetivo.
+        """
+        return bool(self.impactos(np.asarray(posicion, dtype=np.int64)))
+
+    @abstractmethod
+    def describir(self):
+        """
+        Describe el objetivo con tipos de Python (por ejemplo, para JSON).
+        """
+
+
+class ObjetivoPunto(Objetivo):
+    def __init__(self, coordenadas):
+        """
+        Inicializa un objetivo de un solo punto.
+        Args:
+            coordenadas: Las coordenadas enteras del punto.
+        """
+        self.coordenadas = np.asarray(coordenadas, dtype=np.int64)
+        self._tupla = tuple(int(coordenada) for coordenada in coordenadas)
+
+    def impactos(self, posiciones):
+        return (np.asarray(posiciones) == self.coordenadas).all(axis=-1)
+
+    def contiene(self, posicion):
+        return tuple(int(coordenada) for coordenada in posicion) == self._tupla
+
+    def describir(self):
+        return list(self._tupla)
+
+
+class ObjetivosMultiples(Objetivo):
+    def __init__(self, puntos):
+        """
+        Inicializa un objetivo formado por varios puntos.
+        Args:
+            puntos: Una lista de coordenadas enteras.
+        """
+        self.puntos = np.asarray(puntos, dtype=np.int64)
+        self._conjunto = {tuple(int(coordenada) for coordenada in punto) for punto in self.puntos}
+        claves = _claves(self.puntos)
+        self._orden = np.argsort(claves)
+        self._claves_ordenadas = claves[self._orden]
+
+    def indices(self, posiciones):
+        """
+        Indica cuál de los puntos coincide con cada posición.
+        Args:
+            posiciones: Un arreglo entero de forma (..., dimensiones).
+
+        Returns:
+            Un arreglo con el índice del punto en la lista original, o -1 si no coincide.
+        """
+        claves = _claves(posiciones)
+        ubicacion = np.minimum(np.searchsorted(self._claves_ordenadas, claves), len(self._claves_ordenadas) - 1)
+        return np.where(self._claves_ordenadas[ubicacion] == claves, self._orden[ubicacion], -1)
+
+    def impactos(self, posiciones):
+        return np.isin(_claves(posiciones), self._claves_ordenadas)
+
+    def contiene(self, posicion):
+        return tuple(int(coordenada) for coordenada in posicion) in self._conjunto
+
+    def describir(self):
+        return {'puntos': self.puntos.tolist()}
+
+
+class ObjetivoCaja(Objetivo):
+    def __init__(self, minimo, maximo):
+        """
+        Inicializa un objetivo en forma de caja (con los bordes incluidos).
+        Args:
+            minimo: Las coordenadas de la esquina inferior.
+            maximo: Las coordenadas de la esquina superior.
+        """
+        self.minimo = np.asarray(minimo, dtype=np.int64)
+        self.maximo = np.asarray(maximo, dtype=np.int64)
+
+    def impactos(self, posiciones):
+        posiciones = np.asarray(posiciones)
+        return ((posiciones >= self.minimo) & (posiciones <= self.maximo)).all(axis=-1)
+
+    def describir(self):
+        return {'minimo': self.minimo.tolist(), 'maximo': self.maximo.tolist()}
+
+
+class ObjetivoEsfera(Objetivo):
+    def __init__(self, centro, radio):
+        """
+        Inicializa un objetivo en forma de esfera (con el borde incluido).
+        Args:
+            centro: Las coordenadas enteras del centro.
+            radio: El radio de la esfera.
+        """
+        self.centro = np.asarray(centro, dtype=np.int64)
+        self.radio = radio
+        # Se compara con el cuadrado del radio para no calcular raíces
+        self._radio_cuadrado = radio * radio
+
+    def impactos(self, posiciones):
+        diferencia = np.asarray(posiciones) - self.centro
+        return np.einsum('...i,...i->...', diferencia, diferencia) <= self._radio_cuadrado
+
+    def describir(self):
+        return {'centro': self.centro.tolist(), 'radio': self.radio}
+
+
+class ParedAbsorbente(Objetivo):
+    def __init__(self, eje, valor, lado=1):
+        """
+        Inicializa una pared absorbente perpendicular a un eje.
+        Args:
+            eje: El índice del eje (0 para X, 1 para Y, ...).
+            valor: La coordenada de la pared sobre ese eje.
+            lado: 1 si absorbe las posiciones con coordenada >= valor, -1 si absorbe las <= valor.
+        """
+        self.eje = eje
+        self.valor = valor
+        self.lado = lado
+
+    def impactos(self, posiciones):
+        coordenada = np.asarray(posiciones)[..., self.eje]
+        return coordenada >= self.valor if self.lado > 0 else coordenada <= self.valor
+
+    def contiene(self, posicion):
+        coordenada = int(posicion[self.eje])
+        return coordenada >= self.valor if self.lado > 0 else coordenada <= self.valor
+
+    def describir(self):
+        return {'eje': self.eje, 'valor': self.valor, 'lado': self.lado}
+
+
+def como_objetivo(objetivo):
+    """
+    Convierte coordenadas en un ObjetivoPunto y deja pasar los objetivos ya construidos.
+    Args:
+        objetivo: Un Objetivo, unas coordenadas enteras o None.
+
+    Returns:
+        El Objetivo correspondiente o None.
+    """
+    if objetivo is None or isinstance(objetivo, Objetivo):
+        return objetivo
+    return ObjetivoPunto(objetivo)
+
+
+def primeros_pasos(objetivos, bloques):
+    """
+    Encuentra en una sola pasada el primer salto en que se toca cada objetivo.
+    Args:
+        objetivos: Una lista de objetivos (o de coordenadas).
+        bloques: Un iterable de bloques consecutivos de posiciones; la primera posición
+            del primer bloque corresponde al salto 0.
+
+    Returns:
+        Una lista con el primer salto de cada objetivo, o -1 si nunca se tocó.
+    """
+    objetivos = [como_objetivo(objetivo) for objetivo in objetivos]
+    pasos = [-1] * len(objetivos)
+    pendientes = list(range(len(objetivos)))
+    salto_inicial = 0
+    for bloque in bloques:
+        for indice in list(pendientes):
+            impactos = np.flatnonzero(objetivos[indice].impactos(bloque))
+            if impactos.size:
+                pasos[indice] = salto_inicial + int(impactos[0])
+                pendientes.remove(indice)
+        if not pendientes:
+            break
+        salto_inicial += len(bloque)
+    return pasos
@@ -0,0 +1,3 @@
+# Directorio donde se guardan los resultados y las imágenes escaladas entre ejecuciones.
+# Está en un módulo propio para que la interfaz lo use sin importar NumPy
+DIRECTORIO_CACHE = '.cache_rana'
@@ -0,0 +1,159 @@
+import itertools
+
+import numpy as np
+
+# Orden de los saltos de las dimensiones que usa la interfaz, el mismo que
+# asignar_valor_segun_rango_1dim, _2dim y _3dim. Para otras dimensiones se usa
+# +X, -X, +Y, -Y, ...
+_ORDEN_SALTOS = {
+    1: [[-1], [1]],
+    2: [[1, 0], [0, 1], [-1, 0], [0, -1]],
+    3: [[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]],
+}
+
+
+class DistribucionSaltos:
+    def __init__(self, vectores, probabilidades=None):
+        """
+        Inicializa una distribución de saltos definida por una tabla.
+
+        Cada número pseudoaleatorio u se convierte en el índice (código) de una fila de la
+        tabla. Si todas las probabilidades son iguales el código es floor(u * K), que
+        reparte [0, 1] en K rangos exactamente iguales; si no, se busca u con searchsorted
+        en las probabilidades acumuladas.
+
+        Args:
+            vectores: Una matriz (K, dimensiones) con el vector de cada salto posible.
+            probabilidades: La probabilidad de cada salto (por defecto, todos iguales).
+        """
+        self.vectores = np.array(vectores, dtype=np.int64, ndmin=2)
+        cantidad = len(self.vectores)
+        if probabilidades is None:
+            probabilidades = np.full(cantidad, 1 / cantidad)
+        probabilidades = np.asarray(probabilidades, dtype=np.float64)
+        if probabilidades.shape != (cantidad,) or np.any(probabilidades < 0) or probabilidades.sum() <= 0:
+            raise ValueError("Se necesita una probabilidad no negativa por cada vector de salto")
+        self.probabilidades = probabilidades / probabilidades.sum()
+        self.dimensiones = self.vectores.shape[1]
+        self.uniforme = bool(np.all(probabilidades == probabilidades[0]))
+
+        # Límites superiores de los rangos (el último rango termina en 1)
+        self.limites = np.cumsum(self.probabilidades)[:-1]
+        # u = 1 pertenece al último rango con probabilidad positiva
+        self._ultimo = int(np.flatnonzero(self.probabilidades)[-1])
+        self.tipo_codigo = np.int8 if cantidad <= np.iinfo(np.int8).max else np.int16
+
+    @classmethod
+    def estandar(cls, dimensiones):
+        """
+        Crea la caminata simple: un paso de ±1 sobre un eje, todos con la misma probabilidad.
+        Args:
+            dimensiones: El número de dimensiones del espacio.
+
+        Returns:
+            La distribución de saltos.
+        """
+        if dimensiones < 1:
+            raise ValueError("El número de dimensiones debe ser al menos 1")
+        if dimensiones in _ORDEN_SALTOS:
+            return cls(_ORDEN_SALTOS[dimensiones])
+        vectores = np.zeros((2 * dimensiones, dimensiones), dtype=np.int64)
+        ejes = np.arange(dimensiones)
+        vectores[2 * ejes, ejes] = 1
+        vectores[2 * ejes + 1, ejes] = -1
+        return cls(vectores)
+
+    @classmethod
+    def con_diagonales(cls, dimensiones, probabilidades=None):
+        """
+        Crea una caminata que también salta en diagonal (a cualquier vecino de la red).
+        Args:
+            dimensiones: El número de dimensiones del espacio.
+            probabilidades: La probabilidad de cada uno de los 3^N - 1 vecinos (por defecto,
+                todos iguales).
+
+        Returns:
+            La distribución de saltos.
+        """
+        vectores = [vector for vector in itertools.product((-1, 0, 1), repeat=dimensiones) if any(vector)]
+        return cls(vectores, probabilidades)
+
+    @classmethod
+    def sesgada(cls, dimensiones, probabilidades):
+        """
+        Crea una caminata simple con una probabilidad distinta para cada dirección.
+        Args:
+            dimensiones: El número de dimensiones del espacio.
+            probabilidades: La probabilidad de cada salto, en el orden de estandar().
+
+        Returns:
+            La distribución de saltos.
+        """
+        return cls(cls.estandar(dimensiones).vectores, probabilidades)
+
+    def perezosa(self, probabilidad_quieta):
+        """
+        Crea una versión de la distribución en la que la rana a veces no se mueve.
+        Args:
+            probabilidad_quieta: La probabilidad de quedarse en el mismo lugar.
+
+        Returns:
+            Una nueva distribución con el salto nulo agregado al final.
+        """
+        if not 0 <= probabilidad_quieta < 1:
+            raise ValueError("La probabilidad de quedarse quieta debe estar en el rango [0, 1)")
+        vectores = np.vstack((self.vectores, np.zeros((1, self.dimensiones), dtype=np.int64)))
+        probabilidades = np.append(self.probabilidades * (1 - probabilidad_quieta), probabilidad_quieta)
+        return DistribucionSaltos(vectores, probabilidades)
+
+    def codigos(self, numeros):
+        """
+        Convierte de una sola vez números pseudoaleatorios en códigos de salto.
+        Args:
+            numeros: Los números pseudoaleatorios en el rango [0, 1].
+
+        Returns:
+            Un arreglo con el índice de la fila de la tabla que corresponde a cada número.
+        """
+        numeros = np.asarray(numeros, dtype=np.float64)
+        if not np.all((numeros >= 0) & (numeros <= 1)):
+            raise ValueError("El valor debe estar en el rango [0, 1]")
+        if self.uniforme:
+            codigos = numeros * len(self.vectores)
+        else:
+            codigos = np.searchsorted(self.limites, numeros, side='right')
+        return np.minimum(codigos, self._ultimo).astype(self.tipo_codigo)
+
+    def saltos(self, numeros):
+        """
+        Convierte de una sola vez números pseudoaleatorios en vectores de salto.
+        Args:
+            numeros: Los números pseudoaleatorios en el rango [0, 1].
+
+        Returns:
+            Un arreglo con un vector de salto por cada número (forma numeros.shape + (dimensiones,)).
+        """
+        return self.vectores[self.codigos(numeros)]
+
+    def describir(self):
+        """
+        Describe la distribución con tipos de Python (por ejemplo, para JSON).
+        """
+        return {'vectores': self.vectores.tolist(), 'probabilidades': self.probabilidades.tolist()}
+
+
+def como_distribucion(distribucion, dimensiones):
+    """
+    Devuelve la distribución indicada o, si es None, la caminata simple de esas dimensiones.
+    Args:
+        distribucion: Una DistribucionSaltos o None.
+        dimensiones: El número de dimensiones.
+
+    Returns:
+        La distribución de saltos.
+    """
+    if distribucion is None:
+        return DistribucionSaltos.estandar(dimensiones)
+    if distribucion.dimensiones != dimensiones:
+        raise ValueError(f"La distribución de saltos no tiene {dimensiones} dimensiones")
+    return distribucion
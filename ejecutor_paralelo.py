@@ -0,0 +1,173 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from almacen_numeros import TAMANO_BLOQUE
+from montecarlo import simular_lote
+from motor_caminata import simular_en_bloques
+
+
+def _bloques(numeros, inicio, fin, tamano_bloque):
+    """
+    Recorre un segmento de un arreglo por bloques sin copiarlo.
+    """
+    for posicion in range(inicio, fin, tamano_bloque):
+        yield numeros[posicion:min(posicion + tamano_bloque, fin)]
+
+
+def _ejecutar_segmento(origen, inicio, fin, dimensiones, objetivo, limite_saltos, distribucion):
+    """
+    Simula una réplica sobre un segmento del flujo compartido (se ejecuta en un proceso hijo).
+    Args:
+        origen: La ruta de un .npy o la tupla (nombre, longitud) de la memoria compartida.
+        inicio: El primer índice del segmento.
+        fin: El índice siguiente al último del segmento.
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo.
+        limite_saltos: La cantidad máxima de saltos de la réplica.
+        distribucion: La distribución de saltos (None para la caminata simple).
+
+    Returns:
+        El resumen de la caminata de la réplica.
+    """
+    if isinstance(origen, str):
+        numeros = np.load(origen, mmap_mode='r')
+        return simular_en_bloques(dimensiones, objetivo, _bloques(numeros, inicio, fin, TAMANO_BLOQUE), limite_saltos,
+                                  distribucion)
+
+    nombre, longitud = origen
+    memoria = shared_memory.SharedMemory(name=nombre)
+    numeros = np.ndarray((longitud,), dtype=np.float64, buffer=memoria.buf)
+    try:
+        return simular_en_bloques(dimensiones, objetivo, _bloques(numeros, inicio, fin, TAMANO_BLOQUE), limite_saltos,
+                                  distribucion)
+    finally:
+        # La vista debe liberarse antes de cerrar la memoria compartida
+        del numeros
+        memoria.close()
+
+
+def _ejecutar_lote(semilla, cantidad_ranas, saltos, dimensiones, objetivo, distribucion):
+    """
+    Simula un lote de Monte Carlo con una semilla propia (se ejecuta en un proceso hijo).
+    """
+    resultado = simular_lote(cantidad_ranas, saltos, dimensiones, objetivo=objetivo, semilla=semilla,
+                             distribucion=distribucion)
+    return resultado['tiempos_impacto'], resultado['frecuencia_regreso'] * cantidad_ranas
+
+
+def _resumir_saltos(saltos):
+    """
+    Calcula estadísticas básicas de una lista de cantidades de saltos.
+    """
+    if len(saltos) == 0:
+        return {'saltos_media': None, 'saltos_mediana': None, 'saltos_minimo': None, 'saltos_maximo': None}
+    saltos = np.asarray(saltos)
+    return {
+        'saltos_media': float(saltos.mean()),
+        'saltos_mediana': float(np.median(saltos)),
+        'saltos_minimo': int(saltos.min()),
+        'saltos_maximo': int(saltos.max()),
+    }
+
+
+def ejecutar_replicas(numeros, dimensiones, objetivo, replicas, procesos=None, limite_saltos=None, distribucion=None):
+    """
+    Divide un flujo de números en réplicas independientes y las simula en varios procesos.
+
+    Cada réplica usa un segmento disjunto del flujo. Los procesos no reciben listas
+    serializadas: si numeros es la ruta de un .npy cada proceso lo abre con memmap, y si
+    es un arreglo se copia una sola vez a memoria compartida.
+
+    Args:
+        numeros: La ruta de un archivo .npy o un arreglo de números pseudoaleatorios.
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo.
+        replicas: La cantidad de réplicas (segmentos) en que se divide el flujo.
+        procesos: La cantidad de procesos (por defecto, uno por núcleo).
+        limite_saltos: La cantidad máxima de saltos por réplica.
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+    Returns:
+        Un diccionario con las estadísticas agregadas y el resumen de cada réplica.
+    """
+    procesos = procesos or os.cpu_count()
+    memoria = None
+    if isinstance(numeros, str):
+        origen = numeros
+        longitud = len(np.load(numeros, mmap_mode='r'))
+    else:
+        numeros = np.asarray(numeros, dtype=np.float64)
+        longitud = len(numeros)
+        memoria = shared_memory.SharedMemory(create=True, size=max(numeros.nbytes, 1))
+        np.ndarray((longitud,), dtype=np.float64, buffer=memoria.buf)[:] = numeros
+        origen = (memoria.name, longitud)
+
+    try:
+        cortes = np.linspace(0, longitud, replicas + 1).astype(np.int64)
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            futuros = [
+                ejecutor.submit(_ejecutar_segmento, origen, int(cortes[i]), int(cortes[i + 1]), dimensiones, objetivo,
+                                limite_saltos, distribucion)
+                for i in range(replicas)
+            ]
+            resumenes = [futuro.result() for futuro in futuros]
+    finally:
+        if memoria is not None:
+            memoria.close()
+            memoria.unlink()
+
+    saltos_alcanzados = [resumen['saltos'] for resumen in resumenes if resumen['alcanzado']]
+    return {
+        'replicas': replicas,
+        'alcanzadas': len(saltos_alcanzados),
+        'fraccion_alcanzada': len(saltos_alcanzados) / replicas if replicas else 0.0,
+        **_resumir_saltos(saltos_alcanzados),
+        'resumenes': resumenes,
+    }
+
+
+def ejecutar_semillas(cantidad_ranas, saltos, dimensiones, objetivo, tareas, semilla=None, procesos=None,
+                      distribucion=None):
+    """
+    Reparte lotes de Monte Carlo con semillas independientes entre varios procesos.
+
+    Las semillas de las tareas salen de SeedSequence(semilla).spawn, así que el resultado
+    es reproducible y no depende de cuántos procesos se usen.
+
+    Args:
+        cantidad_ranas: La cantidad de ranas por tarea.
+        saltos: La cantidad de saltos que da cada rana.
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo.
+        tareas: La cantidad de lotes independientes.
+        semilla: La semilla raíz.
+        procesos: La cantidad de procesos (por defecto, uno por núcleo).
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+    Returns:
+        Un diccionario con los tiempos de impacto de todas las ranas, la frecuencia de
+        regreso al origen en cada salto y el rendimiento total en pasos de rana por segundo.
+    """
+    semillas = np.random.SeedSequence(semilla).spawn(tareas)
+    inicio_tiempo = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as ejecutor:
+        resultados = list(ejecutor.map(
+            _ejecutar_lote, semillas, [cantidad_ranas] * tareas, [saltos] * tareas,
+            [dimensiones] * tareas, [objetivo] * tareas, [distribucion] * tareas))
+    duracion = time.perf_counter() - inicio_tiempo
+
+    tiempos_impacto = np.concatenate([tiempos for tiempos, _ in resultados])
+    regresos_origen = np.sum([regresos for _, regresos in resultados], axis=0)
+    llegaron = tiempos_impacto[tiempos_impacto >= 0]
+    return {
+        'ranas': len(tiempos_impacto),
+        'tiempos_impacto': tiempos_impacto,
+        'fraccion_alcanzada': len(llegaron) / len(tiempos_impacto) if len(tiempos_impacto) else 0.0,
+        **_resumir_saltos(llegaron),
+        'frecuencia_regreso': regresos_origen / max(len(tiempos_impacto), 1),
+        'pasos_por_segundo': cantidad_ranas * saltos * tareas / duracion if duracion > 0 else float('inf'),
+    }
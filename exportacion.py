@@ -0,0 +1,463 @@
+import gzip
+import json
+import os
+import struct
+import zipfile
+from itertools import islice
+
+import numpy as np
+
+from renderizado import HistogramaEnteros
+
+# Formatos de exportación y la extensión de archivo de cada uno
+FORMATOS = {
+    'npz': '.npz',
+    'binario': '.bin',
+    'csv.gz': '.csv.gz',
+}
+
+# Cantidad máxima de posiciones que el escritor acumula antes de escribir un bloque
+TAMANO_BUFER = 1 << 16
+
+# Nivel de compresión de los CSV.gz: el nivel 1 comprime unas seis veces más rápido que el
+# nivel por defecto y los archivos quedan alrededor de un 25 % más grandes
+NIVEL_GZIP = 1
+
+# Formato binario por bloques: una cabecera JSON y luego registros de un byte de tipo
+# seguido de sus datos (todos los enteros en little-endian)
+_MAGIA = b'RANATRAY'
+_BLOQUE = b'B'
+_HISTOGRAMA = b'H'
+_FIN = b'F'
+_ENTERO = np.dtype('<i8')
+
+
+def formato_de(nombre_archivo):
+    """
+    Deduce el formato de exportación a partir de la extensión de un archivo.
+    Args:
+        nombre_archivo: El nombre del archivo.
+
+    Returns:
+        El nombre del formato (una clave de FORMATOS).
+    """
+    for formato, extension in FORMATOS.items():
+        if nombre_archivo.endswith(extension):
+            return formato
+    raise ValueError(f"No se reconoce el formato de {nombre_archivo}; se esperaba una de las extensiones "
+                     f"{', '.join(FORMATOS.values())}")
+
+
+def _ruta_histograma_csv(nombre_archivo):
+    """
+    Obtiene el archivo donde se guardan los histogramas de una exportación CSV.gz.
+    """
+    return nombre_archivo[:-len(FORMATOS['csv.gz'])] + '_histograma' + FORMATOS['csv.gz']
+
+
+def _texto_csv(tabla):
+    """
+    Da formato CSV a una matriz de enteros con una sola operación de formato de cadenas
+    (bastante más rápido que np.savetxt, que formatea fila por fila).
+    """
+    fila = ','.join(['%d'] * tabla.shape[1]) + '\n'
+    return (fila * len(tabla)) % tuple(tabla.ravel().tolist())
+
+
+def _nombres_ejes(dimensiones):
+    """
+    Obtiene los nombres de las columnas de coordenadas.
+    """
+    return ['x', 'y', 'z'][:dimensiones] if dimensiones <= 3 else [f'x{eje}' for eje in range(dimensiones)]
+
+
+class EscritorTrayectoria:
+    def __init__(self, nombre_archivo, dimensiones, vectores=None, formato=None, tamano_bufer=TAMANO_BUFER):
+        """
+        Inicializa un escritor que exporta una trayectoria mientras se simula.
+
+        Las posiciones (y los códigos de salto, si se indica la tabla de vectores) se
+        acumulan hasta tamano_bufer filas y se escriben como un bloque, así que la
+        memoria no depende del largo de la caminata. Al cerrar se agregan los
+        histogramas de las posiciones de salida de cada eje: la primera posición
+        agregada es la inicial (salto 0) y, como en el histograma de la interfaz, no se
+        cuenta; en 1D son exactamente los datos de ese histograma.
+
+        Formatos:
+        - npz: un .npz comprimido con un miembro por bloque; se escribe con un nombre
+          temporal y se renombra al cerrar.
+        - binario: registros por bloque sin comprimir; si la escritura se interrumpe, los
+          bloques completos se pueden leer igual.
+        - csv.gz: un CSV comprimido con una fila por posición y los histogramas en un
+          archivo aparte con el sufijo _histograma.
+
+        Usado con with, si el bloque termina con una excepción la exportación se
+        descarta en vez de publicarse incompleta (ver descartar).
+
+        Args:
+            nombre_archivo: El archivo de salida.
+            dimensiones: El número de dimensiones.
+            vectores: La tabla de vectores de salto; si se indica, agregar recibe también
+                los códigos de cada salto.
+            formato: Una clave de FORMATOS (por defecto, según la extensión del archivo).
+            tamano_bufer: La cantidad de posiciones por bloque.
+        """
+        self.nombre_archivo = nombre_archivo
+        self.dimensiones = dimensiones
+        self.vectores = None if vectores is None else np.asarray(vectores, dtype=np.int64)
+        self.formato = formato or formato_de(nombre_archivo)
+        if self.formato not in FORMATOS:
+            raise ValueError(f"Formato de exportación desconocido: {self.formato}")
+        self.tamano_bufer = tamano_bufer
+        self.tipo_codigo = None
+        if self.vectores is not None:
+            self.tipo_codigo = np.int8 if len(self.vectores) <= np.iinfo(np.int8).max else np.int16
+        self.posiciones = 0
+        self.agregadas = 0
+        self.bloques = 0
+        self.histogramas = [HistogramaEnteros() for _ in range(dimensiones)]
+        self._pendientes = []
+        self._cantidad_pendiente = 0
+        self._cerrado = False
+        self._abrir()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        if excepcion[0] is None:
+            self.cerrar()
+        else:
+            self.descartar()
+        return False
+
+    def _cabecera(self):
+        return {
+            'dimensiones': self.dimensiones,
+            'vectores': None if self.vectores is None else self.vectores.tolist(),
+            'tipo_codigo': None if self.tipo_codigo is None else np.dtype(self.tipo_codigo).name,
+        }
+
+    def _abrir(self):
+        if self.formato == 'npz':
+            self._temporal = self.nombre_archivo + '.tmp'
+            self._archivo = zipfile.ZipFile(self._temporal, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+            self._escribir_miembro('cabecera', np.array(json.dumps(self._cabecera())))
+        elif self.formato == 'binario':
+            self._archivo = open(self.nombre_archivo, 'wb')
+            cabecera = json.dumps(self._cabecera()).encode()
+            self._archivo.write(_MAGIA + struct.pack('<I', len(cabecera)) + cabecera)
+        else:
+            self._archivo = gzip.open(self.nombre_archivo, 'wt', compresslevel=NIVEL_GZIP, newline='')
+            # La tabla de vectores va en un comentario, que np.loadtxt ignora
+            self._archivo.write(f"# {json.dumps(self._cabecera())}\n")
+            columnas = ['salto'] + _nombres_ejes(self.dimensiones) + (['codigo'] if self.vectores is not None else [])
+            self._archivo.write(','.join(columnas) + '\n')
+
+    def _escribir_miembro(self, nombre, arreglo):
+        with self._archivo.open(nombre + '.npy', 'w', force_zip64=True) as miembro:
+            np.lib.format.write_array(miembro, np.asarray(arreglo), allow_pickle=False)
+
+    def agregar(self, posiciones, codigos=None):
+        """
+        Agrega las posiciones siguientes de la trayectoria.
+        Args:
+            posiciones: Una matriz (k, dimensiones) de posiciones (o un vector en 1D).
+            codigos: Los códigos del salto que llevó a cada posición (CODIGO_ORIGEN para
+                la posición inicial); se requieren si el escritor tiene tabla de vectores
+                y se ignoran si no la tiene.
+        """
+        if self._cerrado:
+            raise ValueError("El escritor ya está cerrado")
+        posiciones = np.asarray(posiciones, dtype=np.int64).reshape(-1, self.dimensiones)
+        if len(posiciones) == 0:
+            return
+        if self.vectores is None:
+            codigos = None
+        else:
+            if codigos is None or len(codigos) != len(posiciones):
+                raise ValueError("Se necesita un código de salto por cada posición")
+            codigos = np.asarray(codigos).astype(self.tipo_codigo)
+        # La posición inicial no es una posición de salida
+        salidas = posiciones[1:] if self.agregadas == 0 else posiciones
+        for eje, histograma in enumerate(self.histogramas):
+            histograma.agregar(salidas[:, eje])
+        self.agregadas += len(posiciones)
+
+        self._pendientes.append((posiciones, codigos))
+        self._cantidad_pendiente += len(posiciones)
+        if self._cantidad_pendiente >= self.tamano_bufer:
+            self._vaciar(completos=True)
+
+    def _vaciar(self, completos=False):
+        """
+        Escribe lo acumulado en bloques de tamano_bufer posiciones; con completos, lo que
+        no llega a un bloque entero queda en el búfer.
+        """
+        if not self._pendientes:
+            return
+        if len(self._pendientes) == 1:
+            posiciones, codigos = self._pendientes[0]
+        else:
+            posiciones = np.concatenate([posiciones for posiciones, _ in self._pendientes])
+            codigos = None
+            if self.vectores is not None:
+                codigos = np.concatenate([codigos for _, codigos in self._pendientes])
+        escritas = len(posiciones) // self.tamano_bufer * self.tamano_bufer if completos else len(posiciones)
+        for inicio in range(0, escritas, self.tamano_bufer):
+            fin = min(inicio + self.tamano_bufer, escritas)
+            self._escribir_bloque(posiciones[inicio:fin], None if codigos is None else codigos[inicio:fin])
+        resto = (posiciones[escritas:].copy(), None if codigos is None else codigos[escritas:].copy())
+        self._pendientes = [resto] if len(resto[0]) else []
+        self._cantidad_pendiente = len(resto[0])
+
+    def _escribir_bloque(self, posiciones, codigos):
+        if self.formato == 'npz':
+            self._escribir_miembro(f'posiciones_{self.bloques:06d}', posiciones)
+            if codigos is not None:
+                self._escribir_miembro(f'codigos_{self.bloques:06d}', codigos)
+        elif self.formato == 'binario':
+            self._archivo.write(_BLOQUE + struct.pack('<q', len(posiciones)))
+            self._archivo.write(posiciones.astype(_ENTERO, copy=False).tobytes())
+            if codigos is not None:
+                self._archivo.write(codigos.tobytes())
+        else:
+            saltos = np.arange(self.posiciones, self.posiciones + len(posiciones), dtype=np.int64)
+            columnas = [saltos[:, np.newaxis], posiciones]
+            if codigos is not None:
+                columnas.append(codigos.astype(np.int64)[:, np.newaxis])
+            self._archivo.write(_texto_csv(np.hstack(columnas)))
+        self.posiciones += len(posiciones)
+        self.bloques += 1
+
+    def cerrar(self):
+        """
+        Escribe lo que queda en el búfer y los histogramas, y cierra el archivo.
+        """
+        if self._cerrado:
+            return
+        self._vaciar()
+        self._cerrado = True
+        if self.formato == 'npz':
+            for eje, histograma in enumerate(self.histogramas):
+                self._escribir_miembro(f'histograma_{eje}_minimo', np.int64(histograma.minimo))
+                self._escribir_miembro(f'histograma_{eje}_frecuencias', histograma.frecuencias)
+            self._archivo.close()
+            os.replace(self._temporal, self.nombre_archivo)
+        elif self.formato == 'binario':
+            for eje, histograma in enumerate(self.histogramas):
+                self._archivo.write(_HISTOGRAMA + struct.pack('<qqq', eje, histograma.minimo, len(histograma.frecuencias)))
+                self._archivo.write(histograma.frecuencias.astype(_ENTERO, copy=False).tobytes())
+            self._archivo.write(_FIN)
+            self._archivo.close()
+        else:
+            self._archivo.close()
+            with gzip.open(_ruta_histograma_csv(self.nombre_archivo), 'wt', compresslevel=NIVEL_GZIP, newline='') as archivo:
+                archivo.write('eje,posicion,frecuencia\n')
+                for eje, histograma in enumerate(self.histogramas):
+                    filas = np.column_stack((np.full(len(histograma.frecuencias), eje), histograma.valores(), histograma.frecuencias))
+                    archivo.write(_texto_csv(filas))
+
+    def descartar(self):
+        """
+        Cierra el archivo sin publicar una exportación incompleta (por ejemplo, si la
+        simulación falló o se interrumpió).
+
+        En npz se borra el archivo temporal y en csv.gz el archivo escrito. En binario se
+        escriben los bloques pendientes y el archivo queda sin histogramas ni marca de
+        fin: los bloques completos se pueden leer, pero se distingue de uno terminado.
+        """
+        if self._cerrado:
+            return
+        self._cerrado = True
+        if self.formato == 'binario':
+            try:
+                self._vaciar()
+            finally:
+                self._archivo.close()
+            return
+        self._archivo.close()
+        os.remove(self._temporal if self.formato == 'npz' else self.nombre_archivo)
+
+
+def _leer_exacto(archivo, cantidad):
+    """
+    Lee exactamente una cantidad de bytes, o None si el archivo termina antes.
+    """
+    datos = archivo.read(cantidad)
+    return datos if len(datos) == cantidad else None
+
+
+def _recorrer_binario(nombre_archivo, leer_bloques=True):
+    """
+    Recorre los registros de un archivo binario, salteando (con seek) los bloques que no
+    se piden. Un registro incompleto al final (escritura interrumpida) se ignora.
+
+    Yields:
+        Primero la cabecera y luego tuplas ('bloque', posiciones, códigos) o
+        ('histograma', eje, (valores, frecuencias)).
+    """
+    with open(nombre_archivo, 'rb') as archivo:
+        if archivo.read(len(_MAGIA)) != _MAGIA:
+            raise ValueError(f"{nombre_archivo} no es una trayectoria exportada en formato binario")
+        longitud, = struct.unpack('<I', archivo.read(4))
+        cabecera = json.loads(archivo.read(longitud))
+        yield cabecera
+        dimensiones = cabecera['dimensiones']
+        tipo_codigo = None if cabecera['tipo_codigo'] is None else np.dtype(cabecera['tipo_codigo'])
+        while True:
+            tipo = archivo.read(1)
+            if tipo == _BLOQUE:
+                cuenta = _leer_exacto(archivo, 8)
+                if cuenta is None:
+                    return
+                cantidad, = struct.unpack('<q', cuenta)
+                bytes_posiciones = cantidad * dimensiones * _ENTERO.itemsize
+                bytes_codigos = 0 if tipo_codigo is None else cantidad * tipo_codigo.itemsize
+                if not leer_bloques:
+                    archivo.seek(bytes_posiciones + bytes_codigos, os.SEEK_CUR)
+                    continue
+                datos = _leer_exacto(archivo, bytes_posiciones + bytes_codigos)
+                if datos is None:
+                    return
+                posiciones = np.frombuffer(datos, dtype=_ENTERO, count=cantidad * dimensiones).reshape(cantidad, dimensiones)
+                codigos = None if tipo_codigo is None else np.frombuffer(datos, dtype=tipo_codigo, offset=bytes_posiciones)
+                yield 'bloque', posiciones.astype(np.int64), codigos
+            elif tipo == _HISTOGRAMA:
+                datos = _leer_exacto(archivo, 24)
+                if datos is None:
+                    return
+                eje, minimo, cantidad = struct.unpack('<qqq', datos)
+                frecuencias = _leer_exacto(archivo, cantidad * _ENTERO.itemsize)
+                if frecuencias is None:
+                    return
+                frecuencias = np.frombuffer(frecuencias, dtype=_ENTERO).astype(np.int64)
+                yield 'histograma', eje, (np.arange(minimo, minimo + cantidad, dtype=np.int64), frecuencias)
+            else:
+                # Fin del archivo o marca de cierre
+                return
+
+
+def _miembros_npz(datos, prefijo):
+    """
+    Obtiene los nombres de los miembros de un bloque de un .npz en orden de escritura.
+
+    Se ordena por el número del bloque y no por el nombre: el número tiene 6 dígitos
+    rellenados con ceros, pero a partir del bloque 10^6 el nombre es más largo y el
+    orden alfabético ya no coincide con el de escritura.
+    """
+    nombres = [nombre for nombre in datos.files if nombre.startswith(prefijo + '_')]
+    return sorted(nombres, key=lambda nombre: int(nombre.rsplit('_', 1)[1]))
+
+
+def leer_cabecera(nombre_archivo):
+    """
+    Lee la descripción de una trayectoria exportada.
+    Args:
+        nombre_archivo: El archivo exportado.
+
+    Returns:
+        Un diccionario con las dimensiones, la tabla de vectores de salto (o None) y el
+        tipo de los códigos (o None).
+    """
+    formato = formato_de(nombre_archivo)
+    if formato == 'npz':
+        with np.load(nombre_archivo) as datos:
+            return json.loads(str(datos['cabecera']))
+    if formato == 'binario':
+        return next(_recorrer_binario(nombre_archivo))
+    with gzip.open(nombre_archivo, 'rt') as archivo:
+        return json.loads(archivo.readline()[1:])
+
+
+def leer_bloques(nombre_archivo, tamano_bloque=TAMANO_BUFER):
+    """
+    Recorre una trayectoria exportada por bloques, sin cargarla completa.
+    Args:
+        nombre_archivo: El archivo exportado.
+        tamano_bloque: La cantidad de filas por bloque al leer un CSV.gz (en los otros
+            formatos se devuelven los bloques tal como se escribieron).
+
+    Yields:
+        Tuplas (posiciones, códigos); los códigos son None si no se exportaron.
+    """
+    formato = formato_de(nombre_archivo)
+    if formato == 'npz':
+        with np.load(nombre_archivo) as datos:
+            codigos = _miembros_npz(datos, 'codigos')
+            for i, nombre in enumerate(_miembros_npz(datos, 'posiciones')):
+                yield datos[nombre], datos[codigos[i]] if codigos else None
+        return
+    if formato == 'binario':
+        for registro in islice(_recorrer_binario(nombre_archivo), 1, None):
+            if registro[0] == 'bloque':
+                yield registro[1], registro[2]
+        return
+
+    cabecera = leer_cabecera(nombre_archivo)
+    dimensiones = cabecera['dimensiones']
+    with gzip.open(nombre_archivo, 'rt') as archivo:
+        # Se saltean la cabecera JSON y la fila de nombres de columnas
+        archivo.readline()
+        archivo.readline()
+        while True:
+            filas = list(islice(archivo, tamano_bloque))
+            if not filas:
+                return
+            tabla = np.loadtxt(filas, delimiter=',', dtype=np.int64, ndmin=2)
+            codigos = None
+            if cabecera['vectores'] is not None:
+                codigos = tabla[:, 1 + dimensiones].astype(cabecera['tipo_codigo'])
+            yield tabla[:, 1:1 + dimensiones], codigos
+
+
+def leer_histogramas(nombre_archivo):
+    """
+    Lee los histogramas de posiciones de salida de una trayectoria exportada.
+    Args:
+        nombre_archivo: El archivo exportado.
+
+    Returns:
+        Una lista con, para cada eje, las coordenadas del rango visitado y la cantidad de
+        visitas a cada una después de algún salto (sin contar la posición inicial).
+    """
+    formato = formato_de(nombre_archivo)
+    if formato == 'npz':
+        with np.load(nombre_archivo) as datos:
+            histogramas = []
+            for eje in range(json.loads(str(datos['cabecera']))['dimensiones']):
+                minimo = int(datos[f'histograma_{eje}_minimo'])
+                frecuencias = datos[f'histograma_{eje}_frecuencias']
+                histogramas.append((np.arange(minimo, minimo + len(frecuencias), dtype=np.int64), frecuencias))
+            return histogramas
+    if formato == 'binario':
+        registros = _recorrer_binario(nombre_archivo, leer_bloques=False)
+        next(registros)
+        return [registro[2] for registro in registros if registro[0] == 'histograma']
+
+    dimensiones = leer_cabecera(nombre_archivo)['dimensiones']
+    tabla = np.loadtxt(_ruta_histograma_csv(nombre_archivo), delimiter=',', skiprows=1, dtype=np.int64, ndmin=2)
+    return [(tabla[tabla[:, 0] == eje, 1], tabla[tabla[:, 0] == eje, 2]) for eje in range(dimensiones)]
+
+
+def leer_trayectoria(nombre_archivo):
+    """
+    Lee completa una trayectoria exportada.
+    Args:
+        nombre_archivo: El archivo exportado.
+
+    Returns:
+        Un diccionario con las dimensiones, la tabla de vectores, las posiciones, los
+        códigos de salto (o None) y los histogramas de leer_histogramas.
+    """
+    cabecera = leer_cabecera(nombre_archivo)
+    bloques = list(leer_bloques(nombre_archivo))
+    posiciones = [posiciones for posiciones, _ in bloques]
+    codigos = [codigos for _, codigos in bloques if codigos is not None]
+    return {
+        'dimensiones': cabecera['dimensiones'],
+        'vectores': None if cabecera['vectores'] is None else np.array(cabecera['vectores'], dtype=np.int64),
+        'posiciones': np.concatenate(posiciones) if posiciones else np.zeros((0, cabecera['dimensiones']), dtype=np.int64),
+        'codigos': np.concatenate(codigos) if codigos else None,
+        'histogramas': leer_histogramas(nombre_archivo),
+    }
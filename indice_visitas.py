@@ -0,0 +1,253 @@
+import numpy as np
+
+import motor_caminata
+import renderizado
+
+# Cantidad de números o posiciones que se procesan por bloque al construir el índice
+TAMANO_BLOQUE = 1 << 18
+
+
+class IndiceVisitas:
+    def __init__(self, dimensiones):
+        """
+        Inicializa un índice vacío de los sitios de la red que visitó una trayectoria.
+
+        Para cada sitio se guarda el primer salto en que se visitó y cuántas veces se
+        visitó. Los sitios se codifican como claves ordenadas, así que cada consulta es
+        una búsqueda binaria (searchsorted) y miles de consultas se resuelven juntas.
+
+        Normalmente se construye con desde_trayectoria o desde_numeros.
+
+        Args:
+            dimensiones: El número de dimensiones.
+        """
+        self.dimensiones = dimensiones
+        self.posiciones = 0
+        self.minimo = None
+        self.maximo = None
+        # Mientras las coordenadas entren en los bits disponibles, cada sitio se empaqueta
+        # en un solo int64; si no, se usan los bytes de sus coordenadas como clave
+        self._bits = 63 // dimensiones
+        self._empaquetado = self._bits >= 2
+        self._bloques = []
+        self._claves = None
+        self._primeros = None
+        self._visitas = None
+
+    @classmethod
+    def desde_trayectoria(cls, posiciones, tamano_bloque=TAMANO_BLOQUE):
+        """
+        Construye el índice en una sola pasada sobre una trayectoria.
+        Args:
+            posiciones: Una matriz de posiciones (o un vector en 1D) o una
+                TrayectoriaCompacta; la primera posición corresponde al salto 0.
+            tamano_bloque: La cantidad de posiciones por bloque.
+
+        Returns:
+            El índice de visitas.
+        """
+        if not hasattr(posiciones, 'iterar_bloques'):
+            posiciones = np.asarray(posiciones)
+            if posiciones.ndim == 1:
+                posiciones = posiciones[:, np.newaxis]
+        indice = cls(posiciones.shape[1])
+        for bloque in renderizado.iterar_bloques(posiciones, tamano_bloque):
+            indice.agregar(bloque)
+        return indice.terminar()
+
+    @classmethod
+    def desde_numeros(cls, dimensiones, numeros, distribucion=None, tamano_bloque=TAMANO_BLOQUE):
+        """
+        Simula la caminata e indexa sus posiciones sin guardar la trayectoria.
+        Args:
+            dimensiones: El número de dimensiones.
+            numeros: Los números pseudoaleatorios (arreglo o memmap).
+            distribucion: La distribución de saltos (por defecto, la caminata simple).
+            tamano_bloque: La cantidad de números por bloque.
+
+        Returns:
+            El índice de visitas.
+        """
+        bloques = (numeros[inicio:inicio + tamano_bloque] for inicio in range(0, len(numeros), tamano_bloque))
+        indice = cls(dimensiones)
+        for bloque in motor_caminata.posiciones_en_bloques(dimensiones, bloques, distribucion):
+            indice.agregar(bloque)
+        return indice.terminar()
+
+    def _limite(self):
+        """
+        La mayor coordenada (en valor absoluto) que admite el empaquetado en int64.
+        """
+        return (1 << (self._bits - 1)) - 1
+
+    def _codificar(self, posiciones):
+        """
+        Convierte posiciones (k, dimensiones) en claves comparables.
+        """
+        posiciones = np.ascontiguousarray(posiciones, dtype=np.int64)
+        if not self._empaquetado:
+            return posiciones.view(np.dtype((np.void, 8 * self.dimensiones)))[:, 0]
+        claves = np.zeros(len(posiciones), dtype=np.int64)
+        for eje in range(self.dimensiones):
+            claves <<= self._bits
+            claves |= posiciones[:, eje] + self._limite()
+        return claves
+
+    def _decodificar(self, claves):
+        """
+        Reconstruye las posiciones a partir de sus claves.
+        """
+        if not self._empaquetado:
+            return np.ascontiguousarray(claves).view(np.int64).reshape(-1, self.dimensiones)
+        posiciones = np.empty((len(claves), self.dimensiones), dtype=np.int64)
+        mascara = (1 << self._bits) - 1
+        for eje in range(self.dimensiones - 1, -1, -1):
+            posiciones[:, eje] = (claves & mascara) - self._limite()
+            claves = claves >> self._bits
+        return posiciones
+
+    def _desempaquetar(self):
+        """
+        Pasa las claves ya agregadas del int64 empaquetado a claves de bytes.
+        """
+        bloques = [(self._decodificar(claves), primeros, visitas) for claves, primeros, visitas in self._bloques]
+        self._empaquetado = False
+        self._bloques = [(self._codificar(posiciones), primeros, visitas) for posiciones, primeros, visitas in bloques]
+
+    def agregar(self, posiciones):
+        """
+        Agrega el siguiente bloque de posiciones consecutivas de la trayectoria.
+        Args:
+            posiciones: Una matriz (k, dimensiones); su primera fila es el salto siguiente
+                al último agregado.
+        """
+        posiciones = np.asarray(posiciones, dtype=np.int64)
+        if len(posiciones) == 0:
+            return
+        minimo, maximo = posiciones.min(axis=0), posiciones.max(axis=0)
+        self.minimo = minimo if self.minimo is None else np.minimum(self.minimo, minimo)
+        self.maximo = maximo if self.maximo is None else np.maximum(self.maximo, maximo)
+        if self._empaquetado and max(-int(self.minimo.min()), int(self.maximo.max())) > self._limite():
+            self._desempaquetar()
+
+        # Cada bloque se reduce a sus sitios distintos con su primer salto y su cantidad de visitas
+        claves, primeros, visitas = np.unique(self._codificar(posiciones), return_index=True, return_counts=True)
+        self._bloques.append((claves, primeros + self.posiciones, visitas))
+        self.posiciones += len(posiciones)
+
+    def terminar(self):
+        """
+        Combina los bloques agregados en el índice final.
+
+        Returns:
+            El propio índice, para encadenar la llamada.
+        """
+        if not self._bloques:
+            self._claves = self._codificar(np.zeros((0, self.dimensiones), dtype=np.int64))
+            self._primeros = np.zeros(0, dtype=np.int64)
+            self._visitas = np.zeros(0, dtype=np.int64)
+            return self
+
+        claves = np.concatenate([claves for claves, _, _ in self._bloques])
+        primeros = np.concatenate([primeros for _, primeros, _ in self._bloques])
+        visitas = np.concatenate([visitas for _, _, visitas in self._bloques])
+        self._bloques = []
+
+        # El orden estable deja primero, entre claves iguales, la del bloque más temprano
+        orden = np.argsort(claves, kind='stable')
+        claves, primeros, visitas = claves[orden], primeros[orden], visitas[orden]
+        inicios = np.flatnonzero(np.concatenate(([True], claves[1:] != claves[:-1])))
+        self._claves = claves[inicios]
+        self._primeros = primeros[inicios]
+        self._visitas = np.add.reduceat(visitas, inicios)
+        return self
+
+    @property
+    def saltos(self):
+        """
+        La cantidad de saltos indexados (sin contar la posición inicial).
+        """
+        return max(self.posiciones - 1, 0)
+
+    @property
+    def sitios_distintos(self):
+        """
+        La cantidad de sitios distintos visitados.
+        """
+        return len(self._claves)
+
+    def consultar(self, sitios):
+        """
+        Busca varios sitios a la vez.
+        Args:
+            sitios: Una matriz (k, dimensiones) de coordenadas enteras.
+
+        Returns:
+            El primer salto en que se visitó cada sitio (-1 si nunca) y la cantidad de
+            visitas de cada uno.
+        """
+        sitios = np.asarray(sitios, dtype=np.int64).reshape(-1, self.dimensiones)
+        primeros = np.full(len(sitios), -1, dtype=np.int64)
+        visitas = np.zeros(len(sitios), dtype=np.int64)
+        if self.sitios_distintos == 0:
+            return primeros, visitas
+
+        # Un sitio fuera del rango recorrido no pudo visitarse (y quizá no se pueda empaquetar)
+        validos = np.flatnonzero(((sitios >= self.minimo) & (sitios <= self.maximo)).all(axis=1))
+        claves = self._codificar(sitios[validos])
+        ubicacion = np.minimum(np.searchsorted(self._claves, claves), len(self._claves) - 1)
+        encontrados = self._claves[ubicacion] == claves
+        primeros[validos[encontrados]] = self._primeros[ubicacion[encontrados]]
+        visitas[validos[encontrados]] = self._visitas[ubicacion[encontrados]]
+        return primeros, visitas
+
+    def primer_paso(self, sitio):
+        """
+        Obtiene el primer salto en que se visitó un sitio.
+        Args:
+            sitio: Las coordenadas del sitio.
+
+        Returns:
+            El número de salto (0 es el origen) o -1 si nunca se visitó.
+        """
+        return int(self.consultar([sitio])[0][0])
+
+    def visitas(self, sitio):
+        """
+        Obtiene cuántas veces se visitó un sitio.
+        Args:
+            sitio: Las coordenadas del sitio.
+
+        Returns:
+            La cantidad de visitas (el origen cuenta la posición inicial).
+        """
+        return int(self.consultar([sitio])[1][0])
+
+    def __contains__(self, sitio):
+        return self.primer_paso(sitio) >= 0
+
+    def sitios(self):
+        """
+        Obtiene los sitios visitados ordenados por su primera visita.
+
+        Returns:
+            Una matriz (sitios_distintos, dimensiones) con las coordenadas, el primer salto
+            de cada sitio y su cantidad de visitas.
+        """
+        orden = np.argsort(self._primeros)
+        return self._decodificar(self._claves[orden]), self._primeros[orden], self._visitas[orden]
+
+    def cobertura(self):
+        """
+        Resume la región cubierta por la trayectoria.
+
+        Returns:
+            Un diccionario con la cantidad de saltos, los sitios distintos visitados y el
+            mínimo y el máximo de cada coordenada.
+        """
+        return {
+            'saltos': self.saltos,
+            'sitios_distintos': self.sitios_distintos,
+            'minimo': None if self.minimo is None else self.minimo.tolist(),
+            'maximo': None if self.maximo is None else self.maximo.tolist(),
+        }
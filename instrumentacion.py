@@ -0,0 +1,278 @@
+import atexit
+import contextlib
+import os
+import sys
+import threading
+import time
+# cProfile, pstats, tracemalloc y json se importan recién cuando se usan: este módulo se
+# carga en cada arranque del simulador y casi siempre con la instrumentación desactivada
+
+try:
+    import resource
+except ImportError:
+    # No existe en Windows; ahí no se informa la memoria máxima del proceso
+    resource = None
+
+# Variables de entorno para activar la instrumentación sin tocar el código:
+# RANA_INSTRUMENTACION es el archivo JSON donde se escribe el informe al salir y
+# RANA_PERFIL una lista separada por comas con 'cprofile' y/o 'tracemalloc'
+VARIABLE_ARCHIVO = 'RANA_INSTRUMENTACION'
+VARIABLE_PERFIL = 'RANA_PERFIL'
+
+MODOS_PERFIL = ('cprofile', 'tracemalloc')
+
+# Cantidad de funciones del perfil de cProfile que se incluyen en el informe
+FUNCIONES_PERFIL = 30
+
+_SIN_MEDICION = contextlib.nullcontext()
+
+
+class _Fase:
+    __slots__ = ('registro', 'nombre', 'inicio', 'pico', 'perfila')
+
+    def __init__(self, registro, nombre):
+        self.registro = registro
+        self.nombre = nombre
+        self.pico = 0
+        self.perfila = False
+
+    def __enter__(self):
+        self.registro._abrir(self)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.registro._cerrar(self, time.perf_counter() - self.inicio)
+        return False
+
+
+class Instrumentacion:
+    def __init__(self):
+        """
+        Inicializa un registro de fases y contadores, desactivado.
+        """
+        self.activa = False
+        self.perfil = None
+        self.memoria = False
+        self._candado = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Borra las mediciones acumuladas.
+        """
+        with self._candado:
+            self._fases = {}
+            self._contadores = {}
+            self._abiertas = []
+            self._perfilando = False
+            if self.perfil is not None:
+                import cProfile
+                self.perfil = cProfile.Profile()
+
+    def activar(self, cprofile=False, memoria=False):
+        """
+        Empieza a registrar fases y contadores.
+        Args:
+            cprofile: Si es True, perfila con cProfile el código dentro de las fases (solo
+                en un hilo a la vez: la fase más externa que empieza primero).
+            memoria: Si es True, registra con tracemalloc el máximo de memoria de cada fase.
+        """
+        self.activa = True
+        if cprofile and self.perfil is None:
+            import cProfile
+            self.perfil = cProfile.Profile()
+        if memoria and not self.memoria:
+            import tracemalloc
+            self.memoria = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def desactivar(self):
+        """
+        Deja de registrar; las mediciones acumuladas se conservan.
+        """
+        self.activa = False
+        if self.memoria:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+        self.memoria = False
+
+    def fase(self, nombre):
+        """
+        Mide la duración de un bloque de código: with instrumentacion.fase('carga'): ...
+        Args:
+            nombre: El nombre de la fase; las mediciones con el mismo nombre se acumulan.
+
+        Returns:
+            Un administrador de contexto (sin costo si la instrumentación está desactivada).
+        """
+        if not self.activa:
+            return _SIN_MEDICION
+        return _Fase(self, nombre)
+
+    def registrar(self, nombre, segundos):
+        """
+        Agrega a una fase una duración medida por fuera (por ejemplo, el arranque del programa).
+        Args:
+            nombre: El nombre de la fase.
+            segundos: La duración en segundos.
+        """
+        if not self.activa:
+            return
+        with self._candado:
+            self._acumular(nombre, segundos)
+
+    def contar(self, nombre, cantidad=1):
+        """
+        Suma una cantidad a un contador.
+        Args:
+            nombre: El nombre del contador.
+            cantidad: La cantidad que se suma.
+        """
+        if not self.activa:
+            return
+        with self._candado:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def _actualizar_picos(self):
+        """
+        Reparte el máximo de memoria desde la última consulta entre las fases abiertas.
+        """
+        if not self.memoria:
+            return
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return
+        _, pico = tracemalloc.get_traced_memory()
+        for fase in self._abiertas:
+            fase.pico = max(fase.pico, pico)
+        tracemalloc.reset_peak()
+
+    def _abrir(self, fase):
+        with self._candado:
+            self._actualizar_picos()
+            self._abiertas.append(fase)
+            # Solo un hilo a la vez puede tener activo el perfilador
+            if self.perfil is not None and not self._perfilando:
+                self._perfilando = fase.perfila = True
+        if fase.perfila:
+            self.perfil.enable()
+
+    def _cerrar(self, fase, duracion):
+        if fase.perfila:
+            self.perfil.disable()
+        with self._candado:
+            self._actualizar_picos()
+            self._abiertas.remove(fase)
+            if fase.perfila:
+                self._perfilando = False
+            medicion = self._acumular(fase.nombre, duracion)
+            if self.memoria:
+                medicion['memoria_pico'] = max(medicion.get('memoria_pico', 0), fase.pico)
+
+    def _acumular(self, nombre, duracion):
+        """
+        Suma una duración a la medición de una fase (con el candado tomado).
+        """
+        medicion = self._fases.setdefault(nombre, {'llamadas': 0, 'segundos': 0.0, 'maximo': 0.0})
+        medicion['llamadas'] += 1
+        medicion['segundos'] += duracion
+        medicion['maximo'] = max(medicion['maximo'], duracion)
+        return medicion
+
+    def informe(self):
+        """
+        Resume las mediciones acumuladas.
+
+        Returns:
+            Un diccionario con, por fase, las llamadas, los segundos totales y el máximo
+            (y el pico de memoria en bytes si se usa tracemalloc), los contadores, la
+            memoria máxima del proceso y, con cProfile, las funciones más costosas.
+        """
+        with self._candado:
+            resultado = {
+                'fases': {nombre: dict(medicion) for nombre, medicion in self._fases.items()},
+                'contadores': dict(self._contadores),
+                'memoria_maxima_proceso': _memoria_maxima_proceso(),
+            }
+        if self.perfil is not None:
+            resultado['perfil'] = _resumir_perfil(self.perfil)
+        return resultado
+
+    def exportar_json(self, nombre_archivo):
+        """
+        Escribe el informe en un archivo JSON.
+        Args:
+            nombre_archivo: El nombre del archivo.
+        """
+        import json
+        with open(nombre_archivo, 'w') as archivo:
+            json.dump(self.informe(), archivo, indent=2)
+
+
+def _memoria_maxima_proceso():
+    """
+    Obtiene el máximo de memoria residente del proceso en bytes (None si no se puede).
+    """
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa kilobytes y macOS bytes
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+
+def _resumir_perfil(perfil, cantidad=FUNCIONES_PERFIL):
+    """
+    Obtiene las funciones con más tiempo acumulado de un perfil de cProfile.
+    """
+    import pstats
+    try:
+        estadisticas = pstats.Stats(perfil)
+    except TypeError:
+        # El perfil todavía no tiene datos
+        return []
+    filas = []
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+        filas.append({
+            'funcion': f"{os.path.basename(archivo)}:{linea}({funcion})",
+            'llamadas': llamadas,
+            'segundos_propios': propio,
+            'segundos_acumulados': acumulado,
+        })
+    filas.sort(key=lambda fila: fila['segundos_acumulados'], reverse=True)
+    return filas[:cantidad]
+
+
+# Registro que usan los módulos del simulador
+INSTRUMENTACION = Instrumentacion()
+
+activar = INSTRUMENTACION.activar
+desactivar = INSTRUMENTACION.desactivar
+reiniciar = INSTRUMENTACION.reiniciar
+fase = INSTRUMENTACION.fase
+registrar = INSTRUMENTACION.registrar
+contar = INSTRUMENTACION.contar
+informe = INSTRUMENTACION.informe
+exportar_json = INSTRUMENTACION.exportar_json
+
+
+def configurar_desde_entorno():
+    """
+    Activa la instrumentación si está definida la variable RANA_INSTRUMENTACION.
+
+    El informe se escribe en ese archivo al terminar el programa. RANA_PERFIL puede
+    agregar los modos 'cprofile' y 'tracemalloc'.
+
+    Returns:
+        El nombre del archivo del informe o None si la instrumentación no se activó.
+    """
+    nombre_archivo = os.environ.get(VARIABLE_ARCHIVO)
+    if not nombre_archivo:
+        return None
+    modos = {modo.strip() for modo in os.environ.get(VARIABLE_PERFIL, '').split(',') if modo.strip()}
+    activar(cprofile='cprofile' in modos, memoria='tracemalloc' in modos)
+
+    atexit.register(exportar_json, nombre_archivo)
+    return nombre_archivo
@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+
+from deteccion import como_objetivo
+from distribucion_saltos import como_distribucion
+from instrumentacion import contar, fase
+
+# Cantidad aproximada de pasos de rana (ranas x saltos) que se procesan por bloque
+PASOS_POR_BLOQUE = 1 << 20
+
+
+def simular_lote(cantidad_ranas, saltos, dimensiones, objetivo=None, semilla=None, numeros=None, distribucion=None):
+    """
+    Simula muchas ranas independientes a la vez sobre un arreglo (ranas, dimensiones).
+
+    En cada bloque se generan los saltos de todas las ranas como un arreglo
+    (saltos_bloque, ranas, dimensiones) y se acumulan con cumsum, así que el costo por
+    salto es vectorizado y la memoria depende del tamaño del bloque.
+
+    Args:
+        cantidad_ranas: La cantidad de ranas que se simulan en paralelo.
+        saltos: La cantidad de saltos que da cada rana.
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo o un Objetivo de deteccion (opcional).
+        semilla: La semilla del generador de números pseudoaleatorios.
+        numeros: Números pseudoaleatorios ya generados (opcional). Se consumen por salto:
+            los primeros cantidad_ranas números son el primer salto de cada rana.
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+    Returns:
+        Un diccionario con los tiempos de impacto (-1 si la rana no llegó), la frecuencia
+        de regreso al origen en cada salto, las posiciones finales con su histograma por
+        eje y el rendimiento en pasos de rana por segundo.
+    """
+    if numeros is not None and len(numeros) < cantidad_ranas * saltos:
+        raise ValueError("No hay suficientes números pseudoaleatorios para el lote")
+    generador = np.random.default_rng(semilla)
+    objetivo = como_objetivo(objetivo)
+    distribucion = como_distribucion(distribucion, dimensiones)
+
+    posiciones = np.zeros((cantidad_ranas, dimensiones), dtype=np.int64)
+    tiempos_impacto = np.full(cantidad_ranas, -1, dtype=np.int64)
+    if objetivo is not None and objetivo.contiene(posiciones[0]):
+        tiempos_impacto[:] = 0
+    regresos_origen = np.zeros(saltos, dtype=np.int64)
+    saltos_por_bloque = max(1, PASOS_POR_BLOQUE // max(cantidad_ranas, 1))
+
+    inicio_tiempo = time.perf_counter()
+    for inicio in range(0, saltos, saltos_por_bloque):
+        fin = min(inicio + saltos_por_bloque, saltos)
+        if numeros is None:
+            uniformes = generador.random((fin - inicio, cantidad_ranas))
+        else:
+            uniformes = np.reshape(numeros[inicio * cantidad_ranas:fin * cantidad_ranas], (fin - inicio, cantidad_ranas))
+
+        with fase('mapeo'):
+            saltos_bloque = distribucion.saltos(uniformes)
+        with fase('caminata'):
+            trayectorias = np.cumsum(saltos_bloque, axis=0)
+            trayectorias += posiciones
+        contar('saltos', trayectorias.shape[0] * trayectorias.shape[1])
+        regresos_origen[inicio:fin] = np.count_nonzero(~trayectorias.any(axis=2), axis=1)
+
+        if objetivo is not None:
+            # Registra el primer salto del bloque en que cada rana pendiente toca el objetivo
+            with fase('deteccion'):
+                impactos = objetivo.impactos(trayectorias)
+                nuevas = impactos.any(axis=0) & (tiempos_impacto < 0)
+                tiempos_impacto[nuevas] = inicio + impactos[:, nuevas].argmax(axis=0) + 1
+
+        posiciones = trayectorias[-1]
+    duracion = time.perf_counter() - inicio_tiempo
+
+    histograma_final = []
+    for eje in range(dimensiones):
+        valores, frecuencias = np.unique(posiciones[:, eje], return_counts=True)
+        histograma_final.append((valores, frecuencias))
+
+    return {
+        'tiempos_impacto': tiempos_impacto,
+        'frecuencia_regreso': regresos_origen / max(cantidad_ranas, 1),
+        'posiciones_finales': posiciones,
+        'histograma_final': histograma_final,
+        'pasos_por_segundo': cantidad_ranas * saltos / duracion if duracion > 0 else float('inf'),
+    }
+
+
+def distribucion_tiempos_impacto(tiempos_impacto):
+    """
+    Resume la distribución de los tiempos de impacto de un lote.
+    Args:
+        tiempos_impacto: Los tiempos de impacto devueltos por simular_lote.
+
+    Returns:
+        Un diccionario con la fracción de ranas que llegaron, los tiempos distintos con su
+        frecuencia y la media y mediana de los tiempos de las ranas que llegaron.
+    """
+    llegaron = tiempos_impacto[tiempos_impacto >= 0]
+    valores, frecuencias = np.unique(llegaron, return_counts=True)
+    return {
+        'fraccion_alcanzada': len(llegaron) / len(tiempos_impacto) if len(tiempos_impacto) else 0.0,
+        'tiempos': valores,
+        'frecuencias': frecuencias,
+        'media': float(llegaron.mean()) if len(llegaron) else None,
+        'mediana': float(np.median(llegaron)) if len(llegaron) else None,
+    }
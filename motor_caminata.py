@@ -0,0 +1,221 @@
+import numpy as np
+
+from deteccion import como_objetivo
+from distribucion_saltos import como_distribucion
+from instrumentacion import contar, fase
+from trayectoria import CODIGO_ORIGEN, ConstructorTrayectoria
+
+# Cantidad de números pseudoaleatorios que se procesan de una sola vez
+TAMANO_BLOQUE = 1 << 18
+
+
+def mapear_saltos(numeros, dimensiones, distribucion=None):
+    """
+    Convierte de una sola vez números pseudoaleatorios en vectores de salto.
+    Args:
+        numeros: Los números pseudoaleatorios en el rango [0, 1].
+        dimensiones: El número de dimensiones del espacio.
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+    Returns:
+        Una matriz con un vector de salto por cada número.
+    """
+    return como_distribucion(distribucion, dimensiones).saltos(numeros)
+
+
+def posiciones_desde_saltos(saltos):
+    """
+    Acumula una serie de saltos en 1D en las posiciones de la rana, empezando por el origen.
+    Args:
+        saltos: Los saltos de la rana (+1 o -1).
+
+    Returns:
+        Un arreglo con el origen y la posición después de cada salto.
+    """
+    return np.concatenate(([0], np.cumsum(saltos)))
+
+
+def simular_hasta_objetivo(dimensiones, objetivo, numeros_pseudoaleatorios, tamano_bloque=TAMANO_BLOQUE,
+                           al_progresar=None, cancelacion=None, distribucion=None, escritor=None):
+    """
+    Simula el movimiento de la rana en un espacio de N dimensiones hasta alcanzar el objetivo.
+
+    Los números se procesan por bloques: cada bloque se convierte en saltos, se acumula
+    con cumsum y se busca la primera posición dentro del objetivo con comparaciones
+    enteras, de modo que la simulación se detiene en el primer bloque que lo alcanza.
+
+    Args:
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo o un Objetivo de deteccion (None para
+            usar todos los números).
+        numeros_pseudoaleatorios: Los números pseudoaleatorios (lista o arreglo).
+        tamano_bloque: La cantidad de números que se procesan por bloque.
+        al_progresar: Función opcional que recibe los saltos realizados y la posición
+            actual después de cada bloque.
+        cancelacion: Evento opcional (threading.Event); si se activa, la simulación se
+            detiene al terminar el bloque actual.
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+        escritor: Un EscritorTrayectoria de exportacion opcional que recibe las posiciones
+            y los códigos de cada bloque a medida que se simulan.
+
+    Returns:
+        El número de saltos realizados y la trayectoria compacta de la rana (un código
+        por salto más puntos de control), empezando por el origen.
+    """
+    objetivo = como_objetivo(objetivo)
+    distribucion = como_distribucion(distribucion, dimensiones)
+    constructor = ConstructorTrayectoria(distribucion.vectores)
+    posicion_actual = np.zeros(dimensiones, dtype=np.int64)
+    if escritor is not None:
+        escritor.agregar(posicion_actual[np.newaxis], [CODIGO_ORIGEN])
+
+    if objetivo is not None and objetivo.contiene(posicion_actual):
+        return 0, constructor.terminar()
+
+    for inicio in range(0, len(numeros_pseudoaleatorios), tamano_bloque):
+        if cancelacion is not None and cancelacion.is_set():
+            break
+        with fase('mapeo'):
+            codigos = distribucion.codigos(numeros_pseudoaleatorios[inicio:inicio + tamano_bloque])
+            saltos = distribucion.vectores[codigos]
+        trayectoria, alcanzado = _avanzar(saltos, objetivo, posicion_actual)
+        constructor.agregar(codigos[:len(trayectoria)], trayectoria)
+        if escritor is not None:
+            escritor.agregar(trayectoria, codigos[:len(trayectoria)])
+        contar('bloques')
+        contar('saltos', len(trayectoria))
+        posicion_actual = trayectoria[-1]
+        if al_progresar is not None:
+            al_progresar(constructor.brincos, posicion_actual)
+        if alcanzado:
+            break
+
+    return constructor.brincos, constructor.terminar()
+
+
+def avanzar_bloque(numeros, dimensiones, objetivo, posicion_inicial, distribucion=None):
+    """
+    Avanza la rana con un bloque de números pseudoaleatorios.
+    Args:
+        numeros: El bloque de números pseudoaleatorios.
+        dimensiones: El número de dimensiones.
+        objetivo: Un Objetivo de deteccion (None para no buscar ninguno).
+        posicion_inicial: La posición de la rana antes del bloque.
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+    Returns:
+        Las posiciones después de cada salto del bloque (recortadas en el primer impacto)
+        y si el objetivo fue alcanzado dentro del bloque.
+    """
+    with fase('mapeo'):
+        saltos = mapear_saltos(numeros, dimensiones, distribucion)
+    return _avanzar(saltos, como_objetivo(objetivo), posicion_inicial)
+
+
+def _avanzar(saltos, objetivo, posicion_inicial):
+    """
+    Acumula un bloque de saltos y lo recorta en el primer impacto con el objetivo.
+    """
+    with fase('caminata'):
+        trayectoria = np.cumsum(saltos, axis=0)
+        trayectoria += posicion_inicial
+
+    if objetivo is None:
+        return trayectoria, False
+
+    # Busca la primera posición del bloque que cae dentro del objetivo
+    with fase('deteccion'):
+        impactos = np.flatnonzero(objetivo.impactos(trayectoria))
+    if impactos.size:
+        return trayectoria[:impactos[0] + 1], True
+    return trayectoria, False
+
+
+def simular_en_bloques(dimensiones, objetivo, bloques, limite_saltos=None, distribucion=None, escritor=None):
+    """
+    Simula la caminata consumiendo los números por bloques, sin guardar posiciones.
+
+    Solo se conservan la posición y el contador de saltos entre bloques, por lo que la
+    memoria depende del tamaño de bloque y no de la cantidad total de números.
+
+    Args:
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo o un Objetivo de deteccion (None para
+            recorrer todos los bloques).
+        bloques: Un iterable de bloques de números pseudoaleatorios.
+        limite_saltos: La cantidad máxima de saltos a simular (sin límite si es None).
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+        escritor: Un EscritorTrayectoria de exportacion opcional; las posiciones se
+            escriben a medida que se simulan, sin guardarlas en memoria.
+
+    Returns:
+        Un diccionario con el resumen de la caminata.
+    """
+    objetivo = como_objetivo(objetivo)
+    distribucion = como_distribucion(distribucion, dimensiones)
+    posicion_actual = np.zeros(dimensiones, dtype=np.int64)
+    minimo = posicion_actual.copy()
+    maximo = posicion_actual.copy()
+    brincos = 0
+    regresos_origen = 0
+    alcanzado = objetivo is not None and objetivo.contiene(posicion_actual)
+    if escritor is not None:
+        escritor.agregar(posicion_actual[np.newaxis], [CODIGO_ORIGEN])
+
+    for bloque in bloques:
+        if alcanzado or (limite_saltos is not None and brincos >= limite_saltos):
+            break
+        if limite_saltos is not None:
+            bloque = bloque[:limite_saltos - brincos]
+        if len(bloque) == 0:
+            continue
+
+        with fase('mapeo'):
+            codigos = distribucion.codigos(bloque)
+            saltos = distribucion.vectores[codigos]
+        trayectoria, alcanzado = _avanzar(saltos, objetivo, posicion_actual)
+        if escritor is not None:
+            escritor.agregar(trayectoria, codigos[:len(trayectoria)])
+        brincos += len(trayectoria)
+        contar('bloques')
+        contar('saltos', len(trayectoria))
+        regresos_origen += int(np.count_nonzero(~trayectoria.any(axis=1)))
+        np.minimum(minimo, trayectoria.min(axis=0), out=minimo)
+        np.maximum(maximo, trayectoria.max(axis=0), out=maximo)
+        posicion_actual = trayectoria[-1]
+
+    return {
+        'dimensiones': dimensiones,
+        'objetivo': None if objetivo is None else objetivo.describir(),
+        'alcanzado': bool(alcanzado),
+        'saltos': brincos,
+        'posicion_final': posicion_actual.tolist(),
+        'minimo': minimo.tolist(),
+        'maximo': maximo.tolist(),
+        'regresos_origen': regresos_origen,
+    }
+
+
+def posiciones_en_bloques(dimensiones, bloques, distribucion=None):
+    """
+    Recorre la caminata como bloques de posiciones, empezando por el origen.
+
+    Sirve para revisar varios objetivos en una sola pasada con deteccion.primeros_pasos.
+
+    Args:
+        dimensiones: El número de dimensiones.
+        bloques: Un iterable de bloques de números pseudoaleatorios.
+        distribucion: La distribución de saltos (por defecto, la caminata simple).
+
+    Yields:
+        Primero el origen (una matriz de una fila) y luego las posiciones de cada bloque.
+    """
+    distribucion = como_distribucion(distribucion, dimensiones)
+    posicion_actual = np.zeros(dimensiones, dtype=np.int64)
+    yield posicion_actual[np.newaxis]
+    for bloque in bloques:
+        if len(bloque) == 0:
+            continue
+        trayectoria, _ = avanzar_bloque(bloque, dimensiones, None, posicion_actual, distribucion)
+        posicion_actual = trayectoria[-1]
+        yield trayectoria
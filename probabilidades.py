@@ -0,0 +1,105 @@
+import numpy as np
+
+# Arreglos ya calculados, por (tipo, dimensiones). Solo se recalculan si se piden más saltos.
+_MEMORIA = {}
+
+
+def _regreso_pares_1dim(mitad):
+    """
+    Calcula P(S_2m = 0) en una dimensión para m = 0..mitad: C(2m, m) / 4^m.
+    """
+    m = np.arange(1, mitad + 1)
+    return np.concatenate(([1.0], np.cumprod((2 * m - 1) / (2 * m))))
+
+
+def _regreso_pares_3dim(mitad):
+    """
+    Calcula P(S_2m = 0) en tres dimensiones para m = 0..mitad.
+
+    Usa la recurrencia exacta del número de caminos cerrados de 2m saltos en la red
+    cúbica, m^3 W(m) = 2(2m-1)(10m^2-10m+3) W(m-1) - 36(m-1)(2m-1)(2m-3) W(m-2),
+    dividida entre 6^(2m) para trabajar directamente con probabilidades.
+    """
+    pares = np.zeros(mitad + 1)
+    pares[0] = 1.0
+    if mitad >= 1:
+        pares[1] = 1 / 6
+    for m in range(2, mitad + 1):
+        pares[m] = (2 * (2 * m - 1) * (10 * m * m - 10 * m + 3) / 36 * pares[m - 1]
+                    - (m - 1) * (2 * m - 1) * (2 * m - 3) / 36 * pares[m - 2]) / m ** 3
+    return pares
+
+
+def _regreso_pares(dimensiones, mitad):
+    """
+    Calcula P(S_2m = 0) para m = 0..mitad en 1, 2 o 3 dimensiones.
+    """
+    if dimensiones == 1:
+        return _regreso_pares_1dim(mitad)
+    if dimensiones == 2:
+        # La caminata en 2D rotada 45 grados son dos caminatas independientes en 1D
+        return _regreso_pares_1dim(mitad) ** 2
+    if dimensiones == 3:
+        return _regreso_pares_3dim(mitad)
+    raise ValueError("Solo hay probabilidades exactas para 1, 2 y 3 dimensiones")
+
+
+def _primer_regreso_pares(dimensiones, mitad):
+    """
+    Calcula la probabilidad de regresar al origen por primera vez en el salto 2m.
+
+    En 1D se usa la forma cerrada f(2m) = u(2m) / (2m - 1). En 2D y 3D se invierte la
+    ecuación de renovación u(2m) = sum f(2k) u(2m - 2k), un producto punto por salto.
+    """
+    regreso = _regreso_pares(dimensiones, mitad)
+    primer_regreso = np.zeros(mitad + 1)
+    if dimensiones == 1:
+        m = np.arange(1, mitad + 1)
+        primer_regreso[1:] = regreso[1:] / (2 * m - 1)
+        return primer_regreso
+    for m in range(1, mitad + 1):
+        primer_regreso[m] = regreso[m] - primer_regreso[1:m] @ regreso[m - 1:0:-1]
+    return primer_regreso
+
+
+def _memorizar(tipo, dimensiones, saltos, calcular_pares):
+    """
+    Devuelve las probabilidades de los saltos 0..saltos, calculándolas solo si hace falta.
+    """
+    guardado = _MEMORIA.get((tipo, dimensiones))
+    if guardado is None or len(guardado) <= saltos:
+        pares = calcular_pares(dimensiones, saltos // 2)
+        # Con saltos impares no se puede estar en el origen
+        guardado = np.zeros(saltos + 1)
+        guardado[::2] = pares
+        guardado.setflags(write=False)
+        _MEMORIA[(tipo, dimensiones)] = guardado
+    return guardado[:saltos + 1]
+
+
+def probabilidades_regreso(dimensiones, saltos):
+    """
+    Calcula las probabilidades exactas de estar en el origen después de cada salto.
+    Args:
+        dimensiones: El número de dimensiones (1, 2 o 3).
+        saltos: El último salto que se quiere calcular.
+
+    Returns:
+        Un arreglo de solo lectura cuyo elemento n es la probabilidad de estar en el
+        origen después del salto n.
+    """
+    return _memorizar('regreso', dimensiones, saltos, _regreso_pares)
+
+
+def probabilidades_primer_regreso(dimensiones, saltos):
+    """
+    Calcula las probabilidades exactas de regresar al origen por primera vez en cada salto.
+    Args:
+        dimensiones: El número de dimensiones (1, 2 o 3).
+        saltos: El último salto que se quiere calcular.
+
+    Returns:
+        Un arreglo de solo lectura cuyo elemento n es la probabilidad de que el primer
+        regreso al origen ocurra en el salto n.
+    """
+    return _memorizar('primer_regreso', dimensiones, saltos, _primer_regreso_pares)
@@ -0,0 +1,257 @@
+import numpy as np
+
+# Resolución máxima (en celdas por eje) de los mapas de densidad en 2D
+RESOLUCION_DENSIDAD = 512
+
+# Cantidad máxima de puntos que se dibujan de una trayectoria
+MAXIMO_PUNTOS = 20000
+
+# Cantidad de posiciones que se procesan por vez al agregar una trayectoria
+TAMANO_BLOQUE = 1 << 18
+
+
+def iterar_bloques(posiciones, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Recorre las posiciones de una trayectoria por bloques.
+    Args:
+        posiciones: Una matriz de posiciones o una TrayectoriaCompacta.
+        tamano_bloque: La cantidad de posiciones por bloque.
+
+    Yields:
+        Matrices con posiciones consecutivas.
+    """
+    if hasattr(posiciones, 'iterar_bloques'):
+        yield from posiciones.iterar_bloques(tamano_bloque)
+        return
+    posiciones = np.asarray(posiciones)
+    for inicio in range(0, len(posiciones), tamano_bloque):
+        yield posiciones[inicio:inicio + tamano_bloque]
+
+
+def columnas_eje(ax):
+    """
+    Calcula el ancho en píxeles de la figura de un eje.
+    Args:
+        ax: El eje de matplotlib.
+
+    Returns:
+        La cantidad de columnas de píxeles disponibles.
+    """
+    return max(1, int(ax.figure.get_size_inches()[0] * ax.figure.dpi))
+
+
+def decimar_min_max(valores, columnas):
+    """
+    Reduce una serie a su mínimo y máximo por columna de píxeles.
+
+    La línea resultante se ve igual que la serie completa a esa resolución, pero tiene
+    a lo sumo 2 puntos por columna sin importar la cantidad de saltos. La serie se
+    recorre por bloques, así que una TrayectoriaCompacta no se reconstruye completa.
+
+    Args:
+        valores: La serie de valores (por ejemplo, las posiciones en 1D), como vector o
+            como trayectoria de una sola dimensión.
+        columnas: La cantidad de columnas de píxeles.
+
+    Returns:
+        Los índices y los valores de los puntos que se deben dibujar.
+    """
+    if len(valores) <= 2 * columnas:
+        return np.arange(len(valores)), np.asarray(valores).reshape(-1)
+
+    # Se agrupa la serie en filas de `ancho` valores, una por columna; los bloques tienen
+    # una cantidad entera de filas y la última fila se rellena con el último valor
+    ancho = -(-len(valores) // columnas)
+    indices, extremos = [], []
+    inicio = 0
+    for bloque in iterar_bloques(valores, ancho * max(1, TAMANO_BLOQUE // ancho)):
+        bloque = np.reshape(bloque, -1)
+        relleno = -len(bloque) % ancho
+        matriz = np.concatenate([bloque, np.repeat(bloque[-1:], relleno)]).reshape(-1, ancho)
+        inicios = np.arange(len(matriz)) * ancho
+        ultimo = len(bloque) - 1
+        indices_minimo = np.minimum(inicios + matriz.argmin(axis=1), ultimo)
+        indices_maximo = np.minimum(inicios + matriz.argmax(axis=1), ultimo)
+
+        # En cada columna se dibuja primero el extremo que aparece antes en la serie
+        locales = np.sort(np.stack([indices_minimo, indices_maximo], axis=1), axis=1).ravel()
+        indices.append(locales + inicio)
+        extremos.append(bloque[locales])
+        inicio += len(bloque)
+    return np.concatenate(indices), np.concatenate(extremos)
+
+
+class HistogramaEnteros:
+    def __init__(self):
+        """
+        Cuenta las apariciones de cada valor entero a medida que llegan bloques de valores,
+        ampliando el rango cuando aparecen valores nuevos.
+        """
+        self.minimo = 0
+        self.frecuencias = np.zeros(0, dtype=np.int64)
+
+    def agregar(self, valores):
+        """
+        Cuenta un bloque de valores enteros.
+        """
+        valores = np.asarray(valores, dtype=np.int64)
+        if len(valores) == 0:
+            return
+        minimo, maximo = int(valores.min()), int(valores.max())
+        if len(self.frecuencias) == 0:
+            self.minimo = minimo
+        if minimo < self.minimo or maximo >= self.minimo + len(self.frecuencias):
+            nuevo_minimo = min(minimo, self.minimo)
+            ampliadas = np.zeros(max(maximo, self.minimo + len(self.frecuencias) - 1) - nuevo_minimo + 1, dtype=np.int64)
+            desplazamiento = self.minimo - nuevo_minimo
+            ampliadas[desplazamiento:desplazamiento + len(self.frecuencias)] = self.frecuencias
+            self.minimo, self.frecuencias = nuevo_minimo, ampliadas
+        self.frecuencias += np.bincount(valores - self.minimo, minlength=len(self.frecuencias))
+
+    def valores(self):
+        """
+        Los valores del rango contado, en el mismo orden que las frecuencias.
+        """
+        return np.arange(self.minimo, self.minimo + len(self.frecuencias), dtype=np.int64)
+
+
+def histograma_enteros(valores, desde=0):
+    """
+    Cuenta cuántas veces aparece cada valor entero, recorriendo los valores por bloques.
+    Args:
+        valores: Los valores enteros (por ejemplo, las posiciones en 1D), como vector o
+            como trayectoria de una sola dimensión.
+        desde: La cantidad de valores iniciales que no se cuentan (1 para omitir el origen).
+
+    Returns:
+        Los valores distintos del rango y su frecuencia.
+    """
+    histograma = HistogramaEnteros()
+    omitir = desde
+    for bloque in iterar_bloques(valores):
+        bloque = np.reshape(bloque, -1)
+        histograma.agregar(bloque[omitir:])
+        omitir = max(omitir - len(bloque), 0)
+    return histograma.valores(), histograma.frecuencias
+
+
+def limites(posiciones):
+    """
+    Obtiene las coordenadas mínimas y máximas de una trayectoria.
+
+    Una TrayectoriaCompacta armada por el motor ya trae sus límites; si no, se recorren
+    los bloques una sola vez calculando el mínimo y el máximo de cada uno.
+
+    Args:
+        posiciones: Una matriz (saltos, dimensiones) con las posiciones o una TrayectoriaCompacta.
+
+    Returns:
+        Los vectores de coordenadas mínimas y máximas.
+    """
+    conocidos = getattr(posiciones, 'limites', None)
+    if conocidos is not None:
+        return conocidos
+    minimos = maximos = None
+    for bloque in iterar_bloques(posiciones):
+        # Por columna: en una matriz angosta es mucho más rápido que reducir con axis=0
+        minimos_bloque = np.array([columna.min() for columna in bloque.T])
+        maximos_bloque = np.array([columna.max() for columna in bloque.T])
+        if minimos is None:
+            minimos, maximos = minimos_bloque, maximos_bloque
+        else:
+            minimos = np.minimum(minimos, minimos_bloque)
+            maximos = np.maximum(maximos, maximos_bloque)
+    return minimos, maximos
+
+
+def rasterizar_densidad(posiciones, resolucion=RESOLUCION_DENSIDAD):
+    """
+    Cuenta las visitas de una trayectoria en 2D sobre una cuadrícula de tamaño acotado.
+
+    La trayectoria se recorre por bloques, así que no hace falta tenerla completa en memoria.
+
+    Args:
+        posiciones: Una matriz (saltos, 2) con las posiciones o una TrayectoriaCompacta.
+        resolucion: La cantidad máxima de celdas por eje.
+
+    Returns:
+        La matriz de densidad (filas en Y, columnas en X) y su extensión
+        (x_min, x_max, y_min, y_max) para imshow.
+    """
+    minimos, maximos = limites(posiciones)
+    # Una celda por punto de la red mientras quepa en la resolución
+    celdas = np.minimum(maximos - minimos + 1, resolucion)
+    rango = [[minimos[0] - 0.5, maximos[0] + 0.5], [minimos[1] - 0.5, maximos[1] + 0.5]]
+
+    densidad = np.zeros(celdas)
+    for bloque in iterar_bloques(posiciones):
+        densidad += np.histogram2d(bloque[:, 0], bloque[:, 1], bins=celdas, range=rango)[0]
+    return densidad.T, (rango[0][0], rango[0][1], rango[1][0], rango[1][1])
+
+
+def submuestrear(posiciones, maximo_puntos=MAXIMO_PUNTOS):
+    """
+    Toma puntos equiespaciados de una trayectoria, conservando el primero y el último.
+    Args:
+        posiciones: Las posiciones de la trayectoria.
+        maximo_puntos: La cantidad máxima de puntos.
+
+    Returns:
+        Las posiciones submuestreadas.
+    """
+    if len(posiciones) <= maximo_puntos:
+        return np.asarray(posiciones)
+    indices = np.linspace(0, len(posiciones) - 1, maximo_puntos).astype(np.int64)
+    return np.asarray(posiciones[indices])
+
+
+def dibujar_linea_1dim(ax, posiciones):
+    """
+    Dibuja las posiciones en 1D decimadas al ancho en píxeles del eje.
+    Args:
+        ax: El eje de matplotlib.
+        posiciones: Las posiciones de la rana en la recta numérica.
+    """
+    indices, valores = decimar_min_max(posiciones, columnas_eje(ax))
+    ax.plot(indices, valores)
+
+
+def dibujar_histograma(ax, posiciones, desde=0):
+    """
+    Dibuja el histograma de posiciones a partir de los conteos ya agregados.
+
+    Se usa un único artista (stairs) en lugar de una barra por posición.
+
+    Args:
+        ax: El eje de matplotlib.
+        posiciones: Las posiciones de la rana en la recta numérica (vector o trayectoria).
+        desde: La cantidad de posiciones iniciales que no se cuentan.
+    """
+    valores, frecuencias = histograma_enteros(posiciones, desde)
+    ax.stairs(frecuencias, np.append(valores, valores[-1] + 1) - 0.5, fill=True, facecolor='skyblue', edgecolor='black')
+
+
+def dibujar_densidad_2dim(ax, posiciones, resolucion=RESOLUCION_DENSIDAD):
+    """
+    Dibuja las posiciones visitadas en 2D como un mapa de densidad.
+    Args:
+        ax: El eje de matplotlib.
+        posiciones: Una matriz (saltos, 2) con las posiciones o una TrayectoriaCompacta.
+        resolucion: La cantidad máxima de celdas por eje.
+    """
+    densidad, extension = rasterizar_densidad(posiciones, resolucion)
+    ax.imshow(np.ma.masked_equal(densidad, 0), origin='lower', extent=extension,
+              cmap='Blues', aspect='auto', interpolation='nearest')
+
+
+def dibujar_trayectoria(ax, posiciones, maximo_puntos=MAXIMO_PUNTOS, **estilo):
+    """
+    Dibuja una trayectoria en 2D o 3D con una cantidad acotada de puntos.
+    Args:
+        ax: El eje de matplotlib (2D o 3D).
+        posiciones: Las posiciones de la trayectoria.
+        maximo_puntos: La cantidad máxima de puntos.
+        estilo: Argumentos adicionales para ax.plot.
+    """
+    puntos = submuestrear(posiciones, maximo_puntos)
+    ax.plot(*puntos.T, **estilo)
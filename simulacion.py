@@ -0,0 +1,176 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+import almacen_numeros
+import exportacion
+import instrumentacion
+import motor_caminata
+from distribucion_saltos import DistribucionSaltos
+import validacion_flujo
+
+# Archivo de números pseudoaleatorios que usa la interfaz gráfica
+ARCHIVO_NUMEROS = 'numeros_ri_final.csv'
+
+# Puntos objetivo de las simulaciones de la interfaz (en 1D se recorre todo el flujo)
+OBJETIVOS = {
+    1: None,
+    2: [250, 300],
+    3: [45, 23, 17],
+}
+
+FORMATOS = ('json', 'csv', 'columnar')
+
+CAMPOS = ('dimensiones', 'objetivo', 'alcanzado', 'saltos', 'posicion_final',
+          'minimo', 'maximo', 'regresos_origen', 'duracion')
+
+
+def ejecutar_simulacion(dimensiones, objetivo=None, entrada=ARCHIVO_NUMEROS, limite_saltos=None,
+                        tamano_bloque=almacen_numeros.TAMANO_BLOQUE, escritor=None):
+    """
+    Ejecuta una simulación sin interfaz gráfica, leyendo el flujo de números por bloques.
+    Args:
+        dimensiones: El número de dimensiones.
+        objetivo: Las coordenadas del punto objetivo (None para recorrer todo el flujo).
+        entrada: El archivo CSV o .npy con los números pseudoaleatorios.
+        limite_saltos: La cantidad máxima de saltos a simular.
+        tamano_bloque: La cantidad de números que se leen por bloque.
+        escritor: Un EscritorTrayectoria de exportacion opcional para guardar las posiciones.
+
+    Returns:
+        Un diccionario con el resumen de la caminata y su duración en segundos.
+    """
+    inicio = time.perf_counter()
+    with instrumentacion.fase('simulacion'):
+        resumen = motor_caminata.simular_en_bloques(
+            dimensiones, objetivo, almacen_numeros.leer_bloques(entrada, tamano_bloque), limite_saltos, escritor=escritor)
+    resumen['duracion'] = time.perf_counter() - inicio
+    return resumen
+
+
+def _columnas(resumenes, campos=CAMPOS):
+    """
+    Convierte una lista de resúmenes en un diccionario de columnas de NumPy.
+    """
+    columnas = {}
+    for campo in campos:
+        valores = [resumen[campo] for resumen in resumenes]
+        listas = [valor for valor in valores if isinstance(valor, list)]
+        if not listas and any(valor is None for valor in valores):
+            columnas[campo] = np.array([np.nan if valor is None else valor for valor in valores], dtype=np.float64)
+        elif any(valor is None for valor in valores) or len({len(valor) for valor in listas}) > 1:
+            # Los valores ausentes (por ejemplo, sin objetivo) y las coordenadas que faltan
+            # en las dimensiones menores se guardan como NaN
+            ancho = max((len(valor) for valor in listas), default=0)
+            columna = np.full((len(valores), ancho), np.nan)
+            for fila, valor in enumerate(valores):
+                if valor is not None:
+                    columna[fila, :len(valor)] = valor
+            columnas[campo] = columna
+        else:
+            columnas[campo] = np.array(valores)
+    return columnas
+
+
+def escribir_resultados(resumenes, formato, salida=None, campos=CAMPOS):
+    """
+    Escribe los resúmenes en un formato legible por máquina.
+    Args:
+        resumenes: La lista de resúmenes de simulación.
+        formato: 'json', 'csv' o 'columnar' (un .npz con un arreglo por campo).
+        salida: El archivo de salida (por defecto, la salida estándar; obligatorio para 'columnar').
+        campos: Los campos de cada resumen que se escriben en las tablas CSV y columnar.
+    """
+    if formato == 'columnar':
+        if salida is None:
+            raise ValueError("El formato columnar necesita un archivo de salida")
+        np.savez_compressed(salida, **_columnas(resumenes, campos))
+        return
+
+    archivo = sys.stdout if salida is None else open(salida, 'w', newline='')
+    try:
+        if formato == 'json':
+            json.dump(resumenes, archivo, indent=2)
+            archivo.write('\n')
+        elif formato == 'csv':
+            escritor_csv = csv.writer(archivo)
+            escritor_csv.writerow(campos)
+            for resumen in resumenes:
+                # Las coordenadas se escriben separadas por espacios dentro de la celda
+                escritor_csv.writerow([
+                    ' '.join(map(str, resumen[campo])) if isinstance(resumen[campo], list)
+                    else '' if resumen[campo] is None else resumen[campo]
+                    for campo in campos
+                ])
+        else:
+            raise ValueError(f"Formato desconocido: {formato}")
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos: python -m simulacion.
+    Args:
+        argumentos: Los argumentos de la línea de comandos (por defecto, sys.argv).
+    """
+    parser = argparse.ArgumentParser(prog='python -m simulacion', description="Simulador de la rana sin interfaz gráfica.")
+    parser.add_argument('-d', '--dimensiones', type=int, required=True, help="Número de dimensiones.")
+    parser.add_argument('-o', '--objetivo', type=int, nargs='+', action='append',
+                        help="Coordenadas del punto objetivo; se puede repetir para simular varios objetivos.")
+    parser.add_argument('-e', '--entrada', default=ARCHIVO_NUMEROS, help="Archivo CSV o .npy con los números pseudoaleatorios.")
+    parser.add_argument('-l', '--limite', type=int, default=None, help="Cantidad máxima de saltos.")
+    parser.add_argument('-f', '--formato', choices=FORMATOS, default='json', help="Formato de salida.")
+    parser.add_argument('-s', '--salida', default=None, help="Archivo de salida (por defecto, la salida estándar).")
+    parser.add_argument('-i', '--instrumentacion', default=None,
+                        help="Archivo JSON donde se escriben los tiempos por fase, contadores y memoria.")
+    parser.add_argument('-p', '--perfil', nargs='+', choices=instrumentacion.MODOS_PERFIL, default=[],
+                        help="Modos de perfilado adicionales para --instrumentacion.")
+    parser.add_argument('-x', '--exportar', default=None,
+                        help=f"Archivo donde se exportan las posiciones, los códigos de salto y los histogramas "
+                             f"({', '.join(exportacion.FORMATOS.values())}); necesita un solo objetivo.")
+    parser.add_argument('-v', '--validar', action='store_true',
+                        help="Valida el flujo de números antes de simular y se detiene si se rechaza.")
+    args = parser.parse_args(argumentos)
+
+    objetivos = args.objetivo or [OBJETIVOS.get(args.dimensiones)]
+    for objetivo in objetivos:
+        if objetivo is not None and len(objetivo) != args.dimensiones:
+            parser.error(f"El objetivo {objetivo} no tiene {args.dimensiones} coordenadas")
+    if args.formato == 'columnar' and args.salida is None:
+        parser.error("El formato columnar necesita --salida")
+    if args.exportar is not None:
+        if len(objetivos) != 1:
+            parser.error("--exportar necesita un solo objetivo")
+        try:
+            exportacion.formato_de(args.exportar)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.perfil and args.instrumentacion is None:
+        parser.error("--perfil necesita --instrumentacion")
+    if args.instrumentacion is not None:
+        instrumentacion.activar(cprofile='cprofile' in args.perfil, memoria='tracemalloc' in args.perfil)
+    if args.validar:
+        informe = validacion_flujo.validar_archivo(args.entrada)
+        if not informe['valido']:
+            parser.exit(1, f"El flujo {args.entrada} no pasó la validación: "
+                           f"{', '.join(validacion_flujo.motivos_rechazo(informe))}\n")
+
+    if args.exportar is not None:
+        vectores = DistribucionSaltos.estandar(args.dimensiones).vectores
+        with exportacion.EscritorTrayectoria(args.exportar, args.dimensiones, vectores) as escritor:
+            resumenes = [ejecutar_simulacion(args.dimensiones, objetivos[0], args.entrada, args.limite, escritor=escritor)]
+    else:
+        resumenes = [ejecutar_simulacion(args.dimensiones, objetivo, args.entrada, args.limite) for objetivo in objetivos]
+    escribir_resultados(resumenes, args.formato, args.salida)
+    if args.instrumentacion is not None:
+        instrumentacion.exportar_json(args.instrumentacion)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+
+
+class TrabajadorSimulacion(threading.Thread):
+    def __init__(self, tarea):
+        """
+        Inicializa un hilo de trabajo para una simulación.
+        Args:
+            tarea: Una función que recibe (al_progresar, cancelacion) y devuelve el
+                resultado de la simulación. Debe llamar a al_progresar(saltos, posicion)
+                periódicamente y detenerse cuando cancelacion.is_set().
+        """
+        super().__init__(daemon=True)
+        self.tarea = tarea
+        self.cancelacion = threading.Event()
+        self.mensajes = queue.Queue()
+        self.resultado = None
+        self.error = None
+        self.inicio = None
+
+    def run(self):
+        """
+        Ejecuta la tarea y guarda su resultado o el error que haya producido.
+        """
+        self.inicio = time.perf_counter()
+        try:
+            self.resultado = self.tarea(self.al_progresar, self.cancelacion)
+        except Exception as error:
+            self.error = error
+
+    def al_progresar(self, saltos, posicion):
+        """
+        Publica el progreso de la simulación (se llama desde el hilo de trabajo).
+        Args:
+            saltos: Los saltos realizados hasta el momento.
+            posicion: La posición actual de la rana.
+        """
+        duracion = time.perf_counter() - self.inicio
+        self.mensajes.put({
+            'saltos': saltos,
+            'posicion': [int(coordenada) for coordenada in posicion],
+            'saltos_por_segundo': saltos / duracion if duracion > 0 else 0.0,
+        })
+
+    def cancelar(self):
+        """
+        Pide a la simulación que se detenga al terminar el bloque actual.
+        """
+        self.cancelacion.set()
+
+    def cancelado(self):
+        """
+        Indica si se pidió cancelar la simulación.
+        """
+        return self.cancelacion.is_set()
+
+    def ultimo_progreso(self):
+        """
+        Obtiene el mensaje de progreso más reciente (se llama desde el hilo de Tk).
+        Returns:
+            El último progreso publicado o None si no hay mensajes nuevos.
+        """
+        progreso = None
+        while True:
+            try:
+                progreso = self.mensajes.get_nowait()
+            except queue.Empty:
+                return progreso
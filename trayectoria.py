@@ -0,0 +1,240 @@
+import numpy as np
+
+# Cada cuántos saltos se guarda la posición completa de la rana
+INTERVALO_CONTROL = 1 << 12
+
+# Cantidad de posiciones que se reconstruyen por vez al recorrer una trayectoria
+TAMANO_BLOQUE = 1 << 18
+
+# Código que acompaña a la posición inicial cuando se listan posiciones junto con el
+# código del salto que llevó a cada una (a la inicial no se llegó con ningún salto)
+CODIGO_ORIGEN = -1
+
+
+class TrayectoriaCompacta:
+    def __init__(self, vectores, codigos, puntos_control, intervalo=INTERVALO_CONTROL, limites=None):
+        """
+        Inicializa una trayectoria guardada como códigos de dirección y puntos de control.
+
+        Cada salto ocupa un byte (el índice de su vector en la tabla de saltos) y cada
+        `intervalo` saltos se guarda la posición completa, así que la posición en
+        cualquier salto se reconstruye sumando a lo sumo `intervalo` saltos.
+
+        Args:
+            vectores: La tabla de vectores de salto, una fila por código.
+            codigos: Los códigos de dirección de cada salto (int8).
+            puntos_control: Las posiciones después de los saltos 0, intervalo, 2*intervalo, ...
+            intervalo: La cantidad de saltos entre puntos de control.
+            limites: Las coordenadas mínimas y máximas de la trayectoria, o None si no se
+                conocen (por ejemplo, en un resultado guardado por una versión anterior).
+        """
+        self.vectores = np.asarray(vectores, dtype=np.int64)
+        self.codigos = codigos
+        self.puntos_control = puntos_control
+        self.intervalo = intervalo
+        self.limites = limites
+        self.dimensiones = self.vectores.shape[1]
+
+    @classmethod
+    def desde_codigos(cls, vectores, codigos, intervalo=INTERVALO_CONTROL):
+        """
+        Construye una trayectoria que empieza en el origen a partir de sus códigos.
+        Args:
+            vectores: La tabla de vectores de salto.
+            codigos: Los códigos de dirección de cada salto.
+            intervalo: La cantidad de saltos entre puntos de control.
+
+        Returns:
+            La trayectoria compacta.
+        """
+        vectores = np.asarray(vectores, dtype=np.int64)
+        constructor = ConstructorTrayectoria(vectores, intervalo)
+        posicion = np.zeros(vectores.shape[1], dtype=np.int64)
+        for inicio in range(0, len(codigos), TAMANO_BLOQUE):
+            bloque = np.asarray(codigos[inicio:inicio + TAMANO_BLOQUE])
+            posiciones = np.cumsum(vectores[bloque], axis=0) + posicion
+            constructor.agregar(bloque, posiciones)
+            posicion = posiciones[-1]
+        return constructor.terminar()
+
+    def a_diccionario(self):
+        """
+        Convierte la trayectoria en un diccionario de arreglos (por ejemplo, para np.savez).
+        """
+        datos = {
+            'vectores': self.vectores,
+            'codigos': self.codigos,
+            'puntos_control': self.puntos_control,
+            'intervalo': np.int64(self.intervalo),
+        }
+        if self.limites is not None:
+            datos['minimos'], datos['maximos'] = self.limites
+        return datos
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """
+        Reconstruye una trayectoria a partir de lo devuelto por a_diccionario.
+        """
+        limites = (datos['minimos'], datos['maximos']) if 'minimos' in datos else None
+        return cls(datos['vectores'], datos['codigos'], datos['puntos_control'], int(datos['intervalo']), limites)
+
+    @property
+    def nbytes(self):
+        """
+        La memoria que ocupan los arreglos de la trayectoria, en bytes.
+        """
+        return self.codigos.nbytes + self.puntos_control.nbytes + self.vectores.nbytes
+
+    @property
+    def shape(self):
+        """
+        La forma de la matriz de posiciones equivalente.
+        """
+        return (len(self), self.dimensiones)
+
+    def __len__(self):
+        """
+        La cantidad de posiciones, incluido el origen (saltos + 1).
+        """
+        return len(self.codigos) + 1
+
+    def posicion(self, salto):
+        """
+        Obtiene la posición de la rana después de un salto.
+        Args:
+            salto: El número de salto (0 es el origen).
+
+        Returns:
+            Un arreglo con las coordenadas de la posición.
+        """
+        if not 0 <= salto < len(self):
+            raise IndexError("El salto está fuera de la trayectoria")
+        control, resto = divmod(salto, self.intervalo)
+        inicio = control * self.intervalo
+        return self.puntos_control[control] + self.vectores[self.codigos[inicio:inicio + resto]].sum(axis=0)
+
+    def posiciones(self, inicio=0, fin=None):
+        """
+        Reconstruye las posiciones de un rango de saltos.
+        Args:
+            inicio: El primer salto del rango.
+            fin: El salto siguiente al último del rango (por defecto, el final).
+
+        Returns:
+            Una matriz (fin - inicio, dimensiones) con las posiciones.
+        """
+        fin = len(self) if fin is None else fin
+        if inicio < 0 or fin > len(self):
+            raise IndexError("El rango está fuera de la trayectoria")
+        if fin <= inicio:
+            return np.zeros((0, self.dimensiones), dtype=np.int64)
+        base = self.posicion(inicio)
+        saltos = self.vectores[self.codigos[inicio:fin - 1]]
+        return np.concatenate((base[np.newaxis], base + np.cumsum(saltos, axis=0)))
+
+    def iterar_bloques(self, tamano_bloque=TAMANO_BLOQUE):
+        """
+        Recorre las posiciones por bloques sin reconstruir toda la trayectoria.
+        Args:
+            tamano_bloque: La cantidad de posiciones por bloque.
+
+        Yields:
+            Matrices con a lo sumo tamano_bloque posiciones consecutivas.
+        """
+        for inicio in range(0, len(self), tamano_bloque):
+            yield self.posiciones(inicio, min(inicio + tamano_bloque, len(self)))
+
+    def __iter__(self):
+        """
+        Recorre las posiciones una por una.
+        """
+        for bloque in self.iterar_bloques():
+            yield from bloque
+
+    def __getitem__(self, indice):
+        """
+        Obtiene posiciones por salto, por rebanada o por una lista de saltos.
+
+        También acepta un par (filas, columnas), por ejemplo trayectoria[:, 0].
+        """
+        if isinstance(indice, tuple):
+            filas, columnas = indice
+            return self[filas][..., columnas]
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if paso == 1:
+                return self.posiciones(inicio, fin)
+            return self[np.arange(inicio, fin, paso)]
+        if np.ndim(indice) == 0:
+            salto = int(indice)
+            if salto < 0:
+                salto += len(self)
+            return self.posicion(salto)
+
+        # Varios saltos: se reconstruye cada tramo entre puntos de control una sola vez
+        indices = np.asarray(indice, dtype=np.int64)
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("Hay saltos fuera de la trayectoria")
+        resultado = np.empty((len(indices), self.dimensiones), dtype=np.int64)
+        controles = indices // self.intervalo
+        for control in np.unique(controles):
+            seleccion = controles == control
+            inicio = int(control) * self.intervalo
+            tramo = self.posiciones(inicio, min(inicio + self.intervalo, len(self)))
+            resultado[seleccion] = tramo[indices[seleccion] - inicio]
+        return resultado
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Reconstruye todas las posiciones como una matriz de NumPy.
+        """
+        posiciones = self.posiciones()
+        return posiciones if dtype is None else posiciones.astype(dtype)
+
+
+class ConstructorTrayectoria:
+    def __init__(self, vectores, intervalo=INTERVALO_CONTROL):
+        """
+        Inicializa un constructor que arma una trayectoria compacta bloque a bloque.
+        Args:
+            vectores: La tabla de vectores de salto.
+            intervalo: La cantidad de saltos entre puntos de control.
+        """
+        self.vectores = np.asarray(vectores, dtype=np.int64)
+        self.intervalo = intervalo
+        self.brincos = 0
+        self._codigos = []
+        self._puntos_control = [np.zeros((1, self.vectores.shape[1]), dtype=np.int64)]
+        # Coordenadas mínimas y máximas visitadas, empezando por el origen
+        self._minimos = np.zeros(self.vectores.shape[1], dtype=np.int64)
+        self._maximos = np.zeros(self.vectores.shape[1], dtype=np.int64)
+
+    def agregar(self, codigos, posiciones):
+        """
+        Agrega un bloque de saltos ya simulado.
+        Args:
+            codigos: Los códigos de dirección del bloque.
+            posiciones: Las posiciones después de cada salto del bloque.
+        """
+        # Los puntos de control caen en los saltos múltiplos del intervalo
+        desplazamiento = (-(self.brincos + 1)) % self.intervalo
+        # Se copian para no mantener vivo el bloque completo de posiciones
+        self._puntos_control.append(posiciones[desplazamiento::self.intervalo].copy())
+        self._codigos.append(codigos)
+        self.brincos += len(codigos)
+        # El bloque ya está en memoria, así que los límites salen sin volver a recorrerlo
+        # (por columna: en una matriz angosta es mucho más rápido que reducir con axis=0)
+        for eje in range(self.vectores.shape[1]) if len(posiciones) else ():
+            columna = posiciones[:, eje]
+            self._minimos[eje] = min(self._minimos[eje], columna.min())
+            self._maximos[eje] = max(self._maximos[eje], columna.max())
+
+    def terminar(self):
+        """
+        Devuelve la trayectoria compacta con todos los bloques agregados.
+        """
+        codigos = np.concatenate(self._codigos) if self._codigos else np.zeros(0, dtype=np.int8)
+        return TrayectoriaCompacta(self.vectores, codigos, np.concatenate(self._puntos_control), self.intervalo,
+                                   (self._minimos.copy(), self._maximos.copy()))
@@ -0,0 +1,334 @@
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+import almacen_numeros
+import instrumentacion
+
+# Nivel de significación con que se rechaza un flujo (el de la familia de pruebas: cada
+# prueba se evalúa con ALFA dividido la cantidad de pruebas, la corrección de Bonferroni)
+ALFA = 0.01
+
+# Cubetas de la prueba chi-cuadrado de uniformidad y, por coordenada, de la de pares
+# consecutivos (CUBETAS_PARES^2 celdas)
+CUBETAS = 10
+CUBETAS_PARES = 10
+
+# Retardos de la autocorrelación serial
+RETARDOS = (1, 2, 3, 4, 5)
+
+# Cubetas del histograma fino con que se estima la estadística de Kolmogorov-Smirnov; el
+# error de la estimación es a lo sumo 1 / CUBETAS_KS
+CUBETAS_KS = 1 << 18
+
+
+def _p_normal(z):
+    """
+    Obtiene el valor p bilateral de una estadística normal estándar.
+    """
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def _p_chi_cuadrado(estadistica, grados):
+    """
+    Obtiene el valor p de una estadística chi-cuadrado con la aproximación de
+    Wilson-Hilferty (la raíz cúbica de chi2 / k es aproximadamente normal).
+    """
+    varianza = 2 / (9 * grados)
+    z = ((estadistica / grados) ** (1 / 3) - (1 - varianza)) / math.sqrt(varianza)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _p_kolmogorov(distancia, cantidad):
+    """
+    Obtiene el valor p de la estadística D de Kolmogorov-Smirnov con la serie asintótica
+    de Kolmogorov y la corrección de Stephens para muestras finitas.
+    """
+    raiz = math.sqrt(cantidad)
+    x = distancia * (raiz + 0.12 + 0.11 / raiz)
+    if x < 0.2:
+        # La serie converge muy lento cerca de 0, donde el valor p es 1
+        return 1.0
+    suma = sum((-1) ** (k - 1) * math.exp(-2 * k * k * x * x) for k in range(1, 101))
+    return min(max(2 * suma, 0.0), 1.0)
+
+
+class ValidadorFlujo:
+    def __init__(self, cubetas=CUBETAS, cubetas_pares=CUBETAS_PARES, retardos=RETARDOS, alfa=ALFA):
+        """
+        Inicializa la validación de un flujo de números pseudoaleatorios U(0, 1).
+
+        El flujo se recibe por bloques con actualizar y cada prueba guarda solo sumas y
+        conteos (más los últimos números del bloque anterior), así que todas se calculan
+        en una sola pasada y con memoria acotada, sin importar el largo del flujo:
+
+        - chi-cuadrado de uniformidad sobre cubetas iguales,
+        - chi-cuadrado de pares consecutivos no superpuestos (x1, x2), (x3, x4), ...,
+        - prueba de rachas por encima y por debajo de 0.5 (Wald-Wolfowitz),
+        - autocorrelación serial en varios retardos,
+        - Kolmogorov-Smirnov contra la distribución uniforme.
+
+        Args:
+            cubetas: Las cubetas de la prueba de uniformidad.
+            cubetas_pares: Las cubetas por coordenada de la prueba de pares.
+            retardos: Los retardos de la autocorrelación.
+            alfa: El nivel de significación con que se rechaza el flujo; cada prueba se
+                evalúa con alfa / cantidad de pruebas, así que un flujo bueno se rechaza
+                con probabilidad de a lo sumo alfa.
+        """
+        self.cubetas = cubetas
+        self.cubetas_pares = cubetas_pares
+        self.retardos = tuple(retardos)
+        self.alfa = alfa
+        self.cantidad = 0
+        self.fuera_de_rango = 0
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.frecuencias = np.zeros(cubetas, dtype=np.int64)
+        self.frecuencias_pares = np.zeros(cubetas_pares * cubetas_pares, dtype=np.int64)
+        self.histograma_ks = np.zeros(CUBETAS_KS, dtype=np.int64)
+        self.mayores_05 = 0
+        self.rachas = 0
+        self.productos = np.zeros(len(self.retardos), dtype=np.float64)
+        # Últimos números del bloque anterior (centrados en 0.5), para las pruebas que
+        # relacionan números vecinos a través del límite entre bloques
+        self._cola = np.zeros(0, dtype=np.float64)
+        self._pendiente_par = None
+
+    def actualizar(self, bloque):
+        """
+        Agrega el siguiente bloque del flujo.
+        Args:
+            bloque: Los números pseudoaleatorios que siguen a los ya agregados.
+        """
+        bloque = np.asarray(bloque, dtype=np.float64).ravel()
+        validos = (bloque >= 0) & (bloque <= 1)
+        if not validos.all():
+            # NaN o valores fuera de [0, 1] invalidan el flujo; no entran en las pruebas
+            self.fuera_de_rango += int(len(bloque) - np.count_nonzero(validos))
+            bloque = bloque[validos]
+        if len(bloque) == 0:
+            return
+
+        self.cantidad += len(bloque)
+        self.suma += float(bloque.sum())
+        self.suma_cuadrados += float(np.dot(bloque, bloque))
+        self.minimo = min(self.minimo, float(bloque.min()))
+        self.maximo = max(self.maximo, float(bloque.max()))
+
+        # Uniformidad y Kolmogorov-Smirnov: histogramas (u = 1 va a la última cubeta)
+        self.frecuencias += np.bincount(np.minimum((bloque * self.cubetas).astype(np.int64), self.cubetas - 1),
+                                        minlength=self.cubetas)
+        self.histograma_ks += np.bincount(np.minimum((bloque * CUBETAS_KS).astype(np.int64), CUBETAS_KS - 1),
+                                          minlength=CUBETAS_KS)
+
+        # Pares consecutivos: un número sin pareja queda pendiente para el bloque siguiente
+        pares = bloque if self._pendiente_par is None else np.concatenate(([self._pendiente_par], bloque))
+        self._pendiente_par = float(pares[-1]) if len(pares) % 2 else None
+        pares = np.minimum((pares[:len(pares) // 2 * 2] * self.cubetas_pares).astype(np.int64), self.cubetas_pares - 1)
+        self.frecuencias_pares += np.bincount(pares[0::2] * self.cubetas_pares + pares[1::2],
+                                              minlength=self.cubetas_pares * self.cubetas_pares)
+
+        # Rachas: cada cambio de lado respecto de 0.5 empieza una racha nueva
+        centrado = bloque - 0.5
+        arriba = centrado >= 0
+        self.mayores_05 += int(np.count_nonzero(arriba))
+        if len(self._cola):
+            self.rachas += int(arriba[0] != (self._cola[-1] >= 0))
+        else:
+            self.rachas += 1
+        self.rachas += int(np.count_nonzero(arriba[1:] != arriba[:-1]))
+
+        # Autocorrelación: sumas de (x_i - 0.5)(x_{i+k} - 0.5), incluidos los pares que
+        # cruzan el límite con el bloque anterior
+        extendido = np.concatenate((self._cola, centrado))
+        desplazamiento = len(self._cola)
+        for i, retardo in enumerate(self.retardos):
+            primero, fin = max(desplazamiento - retardo, 0), len(extendido) - retardo
+            if fin > primero:
+                self.productos[i] += float(np.dot(extendido[primero:fin], extendido[primero + retardo:]))
+        self._cola = extendido[-max(self.retardos + (1,)):].copy()
+
+    def _distancia_ks(self):
+        """
+        Estima la estadística D de Kolmogorov-Smirnov con el histograma fino.
+        """
+        acumulada = np.cumsum(self.histograma_ks) / self.cantidad
+        bordes = np.arange(1, CUBETAS_KS + 1) / CUBETAS_KS
+        # Dentro de una cubeta no se sabe dónde están los números: las diferencias se evalúan
+        # en sus bordes, lo que subestima D en a lo sumo 1 / CUBETAS_KS
+        anterior = np.concatenate(([0.0], acumulada[:-1]))
+        return float(max(np.max(acumulada - bordes), np.max(bordes - 1 / CUBETAS_KS - anterior), 0.0))
+
+    def _prueba(self, estadistica, valor_p, **datos):
+        return {'estadistica': estadistica, 'valor_p': valor_p, **datos}
+
+    def informe(self):
+        """
+        Calcula el resultado de las pruebas con lo agregado hasta el momento.
+
+        Returns:
+            Un diccionario con los conteos y momentos del flujo, el nivel de significación
+            de la familia ('alfa') y el de cada prueba ('alfa_prueba'), el resultado de
+            cada prueba (estadística, valor p y si se aprobó), los nombres de las pruebas
+            rechazadas y 'valido', que es True solo si todos los números están en [0, 1]
+            y se aprobaron todas las pruebas.
+        """
+        n = self.cantidad
+        resultado = {
+            'cantidad': n,
+            'fuera_de_rango': self.fuera_de_rango,
+            'alfa': self.alfa,
+            'alfa_prueba': None,
+            'menores_05': n - self.mayores_05,
+            'mayores_05': self.mayores_05,
+            'media': self.suma / n if n else None,
+            'varianza': self.suma_cuadrados / n - (self.suma / n) ** 2 if n else None,
+            'minimo': self.minimo if n else None,
+            'maximo': self.maximo if n else None,
+            'pruebas': {},
+        }
+        if n < 2:
+            resultado['rechazadas'] = []
+            resultado['valido'] = False
+            return resultado
+        pruebas = resultado['pruebas']
+
+        esperado = n / self.cubetas
+        chi_cuadrado = float(((self.frecuencias - esperado) ** 2).sum() / esperado)
+        pruebas['chi_cuadrado'] = self._prueba(chi_cuadrado, _p_chi_cuadrado(chi_cuadrado, self.cubetas - 1),
+                                               frecuencias=self.frecuencias.tolist())
+
+        cantidad_pares = int(self.frecuencias_pares.sum())
+        if cantidad_pares:
+            celdas = self.cubetas_pares * self.cubetas_pares
+            esperado = cantidad_pares / celdas
+            chi_cuadrado = float(((self.frecuencias_pares - esperado) ** 2).sum() / esperado)
+            pruebas['chi_cuadrado_pares'] = self._prueba(chi_cuadrado, _p_chi_cuadrado(chi_cuadrado, celdas - 1),
+                                                         pares=cantidad_pares)
+
+        arriba, abajo = self.mayores_05, n - self.mayores_05
+        media = 2 * arriba * abajo / n + 1
+        varianza = 2 * arriba * abajo * (2 * arriba * abajo - n) / (n * n * (n - 1))
+        if varianza > 0:
+            z = (self.rachas - media) / math.sqrt(varianza)
+        else:
+            # Todos del mismo lado (o muy pocos números): la prueba no se puede aprobar
+            z = math.inf
+        pruebas['rachas'] = self._prueba(z, _p_normal(z), rachas=self.rachas, esperadas=media)
+
+        # Con números U(0, 1) independientes, 12 * media((x_i - 0.5)(x_{i+k} - 0.5)) tiene
+        # media 0 y varianza 1 / (n - k)
+        autocorrelaciones = {}
+        for retardo, producto in zip(self.retardos, self.productos):
+            if n > retardo:
+                rho = 12 * float(producto) / (n - retardo)
+                z = rho * math.sqrt(n - retardo)
+                autocorrelaciones[str(retardo)] = self._prueba(rho, _p_normal(z))
+        if autocorrelaciones:
+            pruebas['autocorrelacion'] = autocorrelaciones
+
+        distancia = self._distancia_ks()
+        pruebas['kolmogorov_smirnov'] = self._prueba(distancia, _p_kolmogorov(distancia, n))
+
+        # Corrección de Bonferroni: con alfa / m por prueba, la probabilidad de rechazar un
+        # flujo bueno en alguna de las m pruebas es a lo sumo alfa
+        todas = {nombre: prueba for nombre, prueba in pruebas.items() if nombre != 'autocorrelacion'}
+        todas.update((f"autocorrelacion_{retardo}", prueba) for retardo, prueba in autocorrelaciones.items())
+        alfa_prueba = self.alfa / len(todas)
+        for prueba in todas.values():
+            prueba['aprobada'] = prueba['valor_p'] >= alfa_prueba
+        rechazadas = [nombre for nombre, prueba in todas.items() if not prueba['aprobada']]
+        resultado['alfa_prueba'] = alfa_prueba
+        resultado['rechazadas'] = rechazadas
+        resultado['valido'] = self.fuera_de_rango == 0 and not rechazadas
+        return resultado
+
+
+def motivos_rechazo(informe):
+    """
+    Explica por qué se rechazó un flujo.
+    Args:
+        informe: El informe de ValidadorFlujo.informe.
+
+    Returns:
+        Una lista de textos (vacía si el flujo es válido).
+    """
+    if informe['valido']:
+        return []
+    motivos = list(informe['rechazadas'])
+    if informe['fuera_de_rango']:
+        motivos.append('datos fuera de [0, 1]')
+    return motivos or ['muy pocos números']
+
+
+def validar_bloques(bloques, **opciones):
+    """
+    Valida un flujo entregado por bloques.
+    Args:
+        bloques: Un iterable de arreglos con los números, en orden.
+        opciones: Los parámetros de ValidadorFlujo.
+
+    Returns:
+        El informe de ValidadorFlujo.informe.
+    """
+    validador = ValidadorFlujo(**opciones)
+    for bloque in bloques:
+        with instrumentacion.fase('validacion'):
+            validador.actualizar(bloque)
+    return validador.informe()
+
+
+def validar_archivo(nombre_archivo, tamano_bloque=almacen_numeros.TAMANO_BLOQUE, **opciones):
+    """
+    Valida un archivo CSV o .npy de números pseudoaleatorios en una sola pasada por bloques.
+    Args:
+        nombre_archivo: El nombre del archivo.
+        tamano_bloque: La cantidad de números que se leen por bloque.
+        opciones: Los parámetros de ValidadorFlujo.
+
+    Returns:
+        El informe de ValidadorFlujo.informe.
+    """
+    return validar_bloques(almacen_numeros.leer_bloques(nombre_archivo, tamano_bloque), **opciones)
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos: python -m validacion_flujo.
+    Args:
+        argumentos: Los argumentos de la línea de comandos (por defecto, sys.argv).
+
+    Returns:
+        El código de salida: 0 si todos los flujos son válidos, 1 si alguno se rechazó.
+    """
+    parser = argparse.ArgumentParser(prog='python -m validacion_flujo',
+                                     description="Pruebas estadísticas de flujos de números pseudoaleatorios.")
+    parser.add_argument('entradas', nargs='+', help="Archivos CSV o .npy con los números pseudoaleatorios.")
+    parser.add_argument('-a', '--alfa', type=float, default=ALFA,
+                        help="Nivel de significación con que se rechaza un flujo (el conjunto de las pruebas).")
+    parser.add_argument('-s', '--salida', default=None, help="Archivo JSON del informe (por defecto, la salida estándar).")
+    args = parser.parse_args(argumentos)
+
+    informes = {}
+    for entrada in args.entradas:
+        informes[entrada] = informe = validar_archivo(entrada, alfa=args.alfa)
+        estado = 'válido' if informe['valido'] else f"rechazado ({', '.join(motivos_rechazo(informe))})"
+        print(f"{entrada}: {informe['cantidad']} números, {estado}", file=sys.stderr)
+
+    if args.salida is None:
+        json.dump(informes, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.salida, 'w') as archivo:
+            json.dump(informes, archivo, indent=2)
+    return 0 if all(informe['valido'] for informe in informes.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
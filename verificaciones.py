@@ -0,0 +1,277 @@
+import argparse
+import math
+import sys
+import time
+from fractions import Fraction
+
+import numpy as np
+
+import motor_caminata
+import probabilidades
+from distribucion_saltos import DistribucionSaltos
+import trayectoria
+import validacion_flujo
+
+# Flujos buenos y largo de cada uno con que se mide la tasa de rechazo de la validación
+FLUJOS_CALIBRACION = 300
+LARGO_CALIBRACION = 200000
+
+# Flujos y largo de cada uno con que se compara el motor con el recorrido salto a salto
+FLUJOS_MOTOR = 20
+LARGO_MOTOR = 5000
+
+# Objetivos de la comparación: uno cercano y uno inalcanzable que consume todo el flujo
+OBJETIVOS_MOTOR = ([3, -2], [LARGO_MOTOR + 1, 0])
+
+# Tamaños de bloque del motor: uno chico (muchos bordes de bloque) y el predeterminado
+BLOQUES_MOTOR = (97, motor_caminata.TAMANO_BLOQUE)
+
+# Último salto con que se comparan las probabilidades exactas con la fuerza bruta
+SALTOS_PROBABILIDADES = 10
+
+# Cantidades de saltos de las trayectorias compactas cuyo indexado se compara: sin saltos,
+# alrededor de un punto de control y varios tramos con un resto incompleto
+SALTOS_TRAYECTORIA = (0, 1, trayectoria.INTERVALO_CONTROL - 1, trayectoria.INTERVALO_CONTROL,
+                      trayectoria.INTERVALO_CONTROL + 1, 10000)
+
+
+def verificar_calibracion_validacion(flujos=FLUJOS_CALIBRACION, largo=LARGO_CALIBRACION):
+    """
+    Comprueba que la validación rechaza flujos buenos con una tasa cercana a ALFA y que
+    rechaza un flujo claramente malo.
+
+    Returns:
+        Un texto con la tasa de rechazo observada.
+    """
+    alfa = validacion_flujo.ALFA
+    rechazos = sum(not validacion_flujo.validar_bloques([np.random.default_rng(semilla).random(largo)])['valido']
+                   for semilla in range(flujos))
+    # Margen de tres desvíos de la binomial sobre la cantidad esperada de rechazos
+    limite = flujos * alfa + 3 * math.sqrt(flujos * alfa * (1 - alfa))
+    assert rechazos <= limite, f"Se rechazaron {rechazos} de {flujos} flujos buenos (límite {limite:.1f})"
+    malo = np.sort(np.random.default_rng(flujos).random(largo))
+    assert not validacion_flujo.validar_bloques([malo])['valido'], "No se rechazó un flujo ordenado"
+    return f"{rechazos} de {flujos} flujos buenos rechazados (alfa = {alfa})"
+
+
+def _caminata_referencia_2dim(objetivo, numeros):
+    """
+    Recorre la caminata en 2D salto a salto, como lo hacía la versión original del simulador.
+
+    Cada número elige la dirección por cuartos: [0, 0.25) +X, [0.25, 0.5) +Y, [0.5, 0.75) -X
+    y [0.75, 1] -Y. La rana se detiene al llegar al objetivo o al agotar los números.
+
+    Returns:
+        El número de saltos realizados y la lista de posiciones, incluido el origen.
+    """
+    posicion = [0, 0]
+    posiciones = [posicion]
+    for numero in numeros:
+        if posicion == objetivo:
+            break
+        if numero < 0.25:
+            salto = [1, 0]
+        elif numero < 0.5:
+            salto = [0, 1]
+        elif numero < 0.75:
+            salto = [-1, 0]
+        else:
+            salto = [0, -1]
+        posicion = [posicion[0] + salto[0], posicion[1] + salto[1]]
+        posiciones.append(posicion)
+    return len(posiciones) - 1, posiciones
+
+
+def verificar_motor_contra_referencia(flujos=FLUJOS_MOTOR, largo=LARGO_MOTOR):
+    """
+    Comprueba que simular_hasta_objetivo en 2D da los mismos saltos y las mismas posiciones,
+    paso a paso, que el recorrido salto a salto de la versión original.
+
+    Los números se redondean a milésimas como en los CSV, así que aparecen los bordes
+    exactos entre direcciones (0.25, 0.5, 0.75 y 1).
+
+    Returns:
+        Un texto con la cantidad de caminatas comparadas.
+    """
+    comparadas = 0
+    for semilla in range(flujos):
+        numeros = np.round(np.random.default_rng(semilla).random(largo), 3)
+        lista = numeros.tolist()
+        for objetivo in OBJETIVOS_MOTOR:
+            brincos_referencia, posiciones_referencia = _caminata_referencia_2dim(objetivo, lista)
+            for tamano_bloque in BLOQUES_MOTOR:
+                brincos, posiciones = motor_caminata.simular_hasta_objetivo(2, objetivo, numeros,
+                                                                            tamano_bloque=tamano_bloque)
+                posiciones = np.asarray(posiciones).tolist()
+                caso = f"semilla {semilla}, objetivo {objetivo}, bloque {tamano_bloque}"
+                assert brincos == brincos_referencia, f"{caso}: {brincos} saltos en vez de {brincos_referencia}"
+                for salto, (posicion, esperada) in enumerate(zip(posiciones, posiciones_referencia)):
+                    assert posicion == esperada, f"{caso}: en el salto {salto} la rana está en {posicion} y no en {esperada}"
+                assert len(posiciones) == len(posiciones_referencia), f"{caso}: {len(posiciones)} posiciones en vez de {len(posiciones_referencia)}"
+                comparadas += 1
+    return f"{comparadas} caminatas iguales salto a salto"
+
+
+def _probabilidades_fuerza_bruta(dimensiones, saltos):
+    """
+    Calcula con fracciones exactas, propagando la distribución de la posición salto a salto,
+    la probabilidad de estar en el origen y la de regresar a él por primera vez en cada salto.
+
+    Returns:
+        Dos listas de fracciones indexadas por salto (0..saltos).
+    """
+    origen = (0,) * dimensiones
+    vecinos = [tuple(signo if eje == direccion else 0 for eje in range(dimensiones))
+               for direccion in range(dimensiones) for signo in (1, -1)]
+    paso = Fraction(1, len(vecinos))
+    distribucion = {origen: Fraction(1)}
+    # La misma distribución, pero sin las caminatas que ya regresaron al origen
+    sin_regreso = {origen: Fraction(1)}
+    regreso, primer_regreso = [Fraction(1)], [Fraction(0)]
+    for _ in range(saltos):
+        siguiente, siguiente_sin_regreso = {}, {}
+        for actual, destino in ((distribucion, siguiente), (sin_regreso, siguiente_sin_regreso)):
+            for posicion, probabilidad in actual.items():
+                for vecino in vecinos:
+                    nueva = tuple(coordenada + desplazamiento for coordenada, desplazamiento in zip(posicion, vecino))
+                    destino[nueva] = destino.get(nueva, 0) + probabilidad * paso
+        distribucion = siguiente
+        regreso.append(distribucion.get(origen, Fraction(0)))
+        primer_regreso.append(siguiente_sin_regreso.pop(origen, Fraction(0)))
+        sin_regreso = siguiente_sin_regreso
+    return regreso, primer_regreso
+
+
+def verificar_probabilidades_contra_fuerza_bruta(saltos=SALTOS_PROBABILIDADES):
+    """
+    Comprueba las probabilidades exactas de regreso y de primer regreso en 1, 2 y 3
+    dimensiones contra una propagación por fuerza bruta hasta `saltos` saltos.
+
+    Returns:
+        Un texto con la mayor diferencia relativa encontrada.
+    """
+    mayor_diferencia = 0.0
+    for dimensiones in (1, 2, 3):
+        esperadas = _probabilidades_fuerza_bruta(dimensiones, saltos)
+        calculadas = (probabilidades.probabilidades_regreso(dimensiones, saltos),
+                      probabilidades.probabilidades_primer_regreso(dimensiones, saltos))
+        for nombre, esperada, calculada in zip(('regreso', 'primer_regreso'), esperadas, calculadas):
+            for salto in range(saltos + 1):
+                exacta = float(esperada[salto])
+                assert math.isclose(calculada[salto], exacta, rel_tol=1e-12, abs_tol=1e-15), \
+                    f"{nombre} en {dimensiones}D, salto {salto}: {float(calculada[salto])!r} en vez de {exacta!r}"
+                if exacta:
+                    mayor_diferencia = max(mayor_diferencia, abs(calculada[salto] - exacta) / exacta)
+    return f"1D a 3D hasta el salto {saltos}, diferencia relativa máxima {mayor_diferencia:.1e}"
+
+
+def _comparar_indexado(compacta, referencia, indice):
+    """
+    Comprueba que indexar la trayectoria compacta da lo mismo que indexar la matriz.
+    """
+    obtenido = np.asarray(compacta[indice])
+    esperado = referencia[indice]
+    assert obtenido.shape == esperado.shape and np.array_equal(obtenido, esperado), \
+        f"{len(compacta)} posiciones, índice {indice!r}: {obtenido.tolist()} en vez de {esperado.tolist()}"
+
+
+def verificar_indexado_trayectoria(cantidades=SALTOS_TRAYECTORIA):
+    """
+    Comprueba que una TrayectoriaCompacta en 1, 2 y 3 dimensiones se indexa igual que la
+    matriz de posiciones: por salto, por rebanada (con y sin paso), por lista de saltos y
+    por (filas, columnas). También comprueba que los índices fuera de la trayectoria
+    lanzan IndexError, y que los límites y la reconstrucción por bloques coinciden.
+
+    La referencia se arma con cumsum de los vectores de salto, sin pasar por la trayectoria.
+
+    Returns:
+        Un texto con la cantidad de trayectorias comparadas.
+    """
+    rng = np.random.default_rng(0)
+    comparadas = 0
+    for dimensiones in (1, 2, 3):
+        vectores = DistribucionSaltos.estandar(dimensiones).vectores
+        for cantidad in cantidades:
+            codigos = rng.integers(0, len(vectores), cantidad).astype(np.int8)
+            compacta = trayectoria.TrayectoriaCompacta.desde_codigos(vectores, codigos)
+            referencia = np.concatenate((np.zeros((1, dimensiones), dtype=np.int64),
+                                         np.cumsum(vectores[codigos], axis=0, dtype=np.int64)))
+            largo = len(referencia)
+            assert len(compacta) == largo and compacta.shape == referencia.shape, \
+                f"{largo} posiciones: la trayectoria tiene forma {compacta.shape}"
+
+            saltos = sorted({0, largo - 1, -1, -largo, *rng.integers(-largo, largo, 5).tolist(),
+                             *[salto for salto in (trayectoria.INTERVALO_CONTROL - 1, trayectoria.INTERVALO_CONTROL)
+                               if salto < largo]})
+            rebanadas = [slice(None), slice(1, None), slice(-3, None), slice(None, None, 7), slice(None, None, -1),
+                         slice(largo // 3, 2 * largo // 3, 5), slice(largo - 1, 0, -3), slice(largo, 0)]
+            listas = [[], saltos, rng.integers(-largo, largo, 50).tolist()]
+            pares = [(slice(None), 0), (slice(None, None, 3), dimensiones - 1), (saltos, 0), (-1, dimensiones - 1)]
+            for indice in [*saltos, *rebanadas, *listas, *pares]:
+                _comparar_indexado(compacta, referencia, indice)
+
+            for indice in (largo, -largo - 1, [0, largo], [-largo - 1]):
+                try:
+                    compacta[indice]
+                except IndexError:
+                    continue
+                raise AssertionError(f"{largo} posiciones: el índice {indice!r} no lanzó IndexError")
+            for inicio, fin in ((-5, None), (0, largo + 1)):
+                try:
+                    compacta.posiciones(inicio, fin)
+                except IndexError:
+                    continue
+                raise AssertionError(f"{largo} posiciones: posiciones({inicio}, {fin}) no lanzó IndexError")
+
+            bloques = np.concatenate(list(compacta.iterar_bloques(1000)))
+            assert np.array_equal(bloques, referencia), f"{largo} posiciones: iterar_bloques no reconstruye la trayectoria"
+            minimos, maximos = compacta.limites
+            assert np.array_equal(minimos, referencia.min(axis=0)) and np.array_equal(maximos, referencia.max(axis=0)), \
+                f"{largo} posiciones: límites {compacta.limites} incorrectos"
+            comparadas += 1
+    return f"{comparadas} trayectorias indexadas igual que su matriz"
+
+
+# Verificaciones disponibles: nombre -> función sin argumentos que devuelve un detalle o
+# lanza AssertionError
+VERIFICACIONES = {
+    'calibracion_validacion': verificar_calibracion_validacion,
+    'motor_contra_referencia': verificar_motor_contra_referencia,
+    'probabilidades_contra_fuerza_bruta': verificar_probabilidades_contra_fuerza_bruta,
+    'indexado_trayectoria': verificar_indexado_trayectoria,
+}
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos: python -m verificaciones.
+    Args:
+        argumentos: Los argumentos de la línea de comandos (por defecto, sys.argv).
+
+    Returns:
+        El código de salida: 1 si alguna verificación falló, 0 si no.
+    """
+    parser = argparse.ArgumentParser(prog='python -m verificaciones',
+                                     description="Verificaciones de las propiedades del simulador de la rana.")
+    parser.add_argument('verificaciones', nargs='*', help=f"Verificaciones a ejecutar (por defecto, todas): "
+                                                          f"{', '.join(VERIFICACIONES)}.")
+    args = parser.parse_args(argumentos)
+    for nombre in args.verificaciones:
+        if nombre not in VERIFICACIONES:
+            parser.error(f"Verificación desconocida: {nombre}")
+
+    fallas = 0
+    for nombre in args.verificaciones or VERIFICACIONES:
+        inicio = time.perf_counter()
+        try:
+            detalle = VERIFICACIONES[nombre]()
+        except AssertionError as error:
+            fallas += 1
+            print(f"FALLA {nombre}: {error}", file=sys.stderr)
+            continue
+        print(f"ok    {nombre} ({time.perf_counter() - inicio:.1f} s): {detalle}", file=sys.stderr)
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())